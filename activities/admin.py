@@ -1,10 +1,16 @@
 from django.contrib import admin
-from .models import ActivityCategory, Activity, Consumption
+from django.utils import timezone
+from .models import ActivityCategory, Activity, Consumption, ConsumptionIngredient, Ingredient
 
 class ConsumptionInline(admin.TabularInline):
     model = Consumption
     extra = 1
 
+class ConsumptionIngredientInline(admin.TabularInline):
+    model = ConsumptionIngredient
+    extra = 1
+    autocomplete_fields = ('ingredient',)
+
 @admin.register(ActivityCategory)
 class ActivityCategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'description')
@@ -23,5 +29,16 @@ class ActivityAdmin(admin.ModelAdmin):
 class ConsumptionAdmin(admin.ModelAdmin):
     list_display = ('activity', 'consumed_at')
     list_filter = ('consumed_at',)
-    search_fields = ('activity__name', 'description', 'ingredients')
-    date_hierarchy = 'consumed_at' 
\ No newline at end of file
+    search_fields = ('activity__name', 'description', 'ingredient_items__key')
+    date_hierarchy = 'consumed_at'
+    inlines = [ConsumptionIngredientInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Bump the activity so its cached list card is re-rendered
+        Activity.objects.filter(pk=form.instance.activity_id).update(updated_at=timezone.now())
+
+@admin.register(Ingredient)
+class IngredientAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key')
+    search_fields = ('key',)
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Native async versions of the activities JSON endpoints.
+
+Under ASGI these avoid handing the whole request to a worker thread: reads
+use the async ORM and cache APIs, and only work that must be synchronous
+(the create transaction) runs through sync_to_async. urls.py routes to them
+when settings.ASYNC_VIEWS is on; the sync views in views.py remain the
+default under WSGI.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_POST
+
+from .cache import FAVORITES_CACHE_TIMEOUT, favorites_cache_key
+from .categories import category_registry
+from .conditional import condition_on_activities, detail_scope, favorites_scope, favorites_state
+from .models import Activity
+from .views import (
+    activity_detail_data, create_activities_batch, favorites_query, fold_favorite_rows, parse_activity_payload,
+    save_new_activity,
+)
+
+
+@login_required
+@condition_on_activities(favorites_scope, favorites_state)
+async def get_favorites(request, category_slug):
+    """Get favorite activities for a specific category."""
+    user = await request.auser()
+    # Serve the serialized payload from cache; signals invalidate it on every write
+    cache_key = favorites_cache_key(user.id, category_slug)
+    content = await cache.aget(cache_key)
+    if content is None:
+        content = json.dumps(await build_favorites(user, category_slug), cls=DjangoJSONEncoder)
+        await cache.aset(cache_key, content, FAVORITES_CACHE_TIMEOUT)
+
+    return HttpResponse(content, content_type='application/json')
+
+
+async def build_favorites(user, category_slug):
+    """Async version of views.build_favorites"""
+    category = await category_registry.aget(category_slug)
+    if category is None:
+        return []
+
+    rows = [row async for row in favorites_query(user, category)]
+    if category.slug != 'consume':
+        return rows
+    return fold_favorite_rows(rows)
+
+
+@login_required
+@condition_on_activities(detail_scope)
+async def activity_detail(request, pk):
+    """View for a single activity."""
+    user = await request.auser()
+    activity = await Activity.objects.for_list().filter(pk=pk, user=user).afirst()
+    if activity is None:
+        raise Http404('No Activity matches the given query.')
+
+    # Return JSON for AJAX requests
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse(activity_detail_data(activity))
+
+    # Templates may touch the database (request.user in the navbar), so render in a thread
+    return await sync_to_async(render)(request, 'activities/activity_detail.html', {'activity': activity})
+
+
+@require_POST
+async def create_activity(request):
+    try:
+        # Get request data
+        data = json.loads(request.body)
+        user = await request.auser()
+
+        # An array of payloads is created as one batch
+        if isinstance(data, list):
+            try:
+                return JsonResponse(await sync_to_async(create_activities_batch)(user, data))
+            except IntegrityError:
+                return JsonResponse({'message': 'An identical favorite activity already exists'}, status=400)
+
+        category = await category_registry.aget(data.get('category'))
+        fields = parse_activity_payload(data, user, category)
+
+        try:
+            # Transactions are sync-only, so the whole write runs in one thread hop
+            await sync_to_async(save_new_activity)(user, fields)
+        except IntegrityError:
+            return JsonResponse({'message': 'An identical favorite activity already exists'}, status=400)
+
+        return JsonResponse({'message': 'Activity created successfully'})
+
+    except json.JSONDecodeError:
+        return JsonResponse({'message': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        return JsonResponse({'message': str(e)}, status=400)
@@ -0,0 +1,19 @@
+from django.core.cache import cache
+
+# Favorites are invalidated on write, so they can live in the cache for a long time
+FAVORITES_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def favorites_cache_key(user_id, category_slug):
+    """Return the cache key for a user's serialized favorites in a category"""
+    return f'activities:favorites:{user_id}:{category_slug}'
+
+
+def favorites_state_key(user_id, category_slug):
+    """Return the cache key for the conditional GET validators of a user's favorites in a category"""
+    return f'{favorites_cache_key(user_id, category_slug)}:state'
+
+
+def invalidate_favorites(user_id, category_slug):
+    """Drop a user's cached favorites and their validators for a category"""
+    cache.delete_many([favorites_cache_key(user_id, category_slug), favorites_state_key(user_id, category_slug)])
@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+# Bumped whenever a category changes, so every process reloads its registry
+CATEGORY_VERSION_KEY = 'activities:categories:version'
+
+# Seconds between version checks, so lookups don't cost a cache round trip each
+CATEGORY_VERSION_CHECK_INTERVAL = 5
+
+
+class CategoryRegistry:
+    """
+    Process-wide registry of activity categories, keyed by slug and id.
+
+    Categories are loaded once and reused until the version stored in the
+    cache changes; saving or deleting a category bumps that version (see
+    signals). The version is read at most every check_interval seconds, so
+    other workers sharing the cache pick a change up within that time, and the
+    process that made it right away. The instances are shared across requests
+    and must not be modified.
+    """
+
+    def __init__(self, check_interval=CATEGORY_VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._categories = []
+        self._by_slug = {}
+        self._by_id = {}
+
+    @property
+    def version(self):
+        """Return the loaded category version, reloading first if a check is due"""
+        self._load()
+        return self._version
+
+    def _cached_version(self):
+        """Return the version in the cache, creating one if the cache has none"""
+        version = cache.get(CATEGORY_VERSION_KEY)
+        if version is None:
+            cache.add(CATEGORY_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(CATEGORY_VERSION_KEY)
+        return version
+
+    def _load(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        version = self._cached_version()
+        self._checked_at = now
+        if version == self._version:
+            return
+        from .models import ActivityCategory
+
+        with self._lock:
+            categories = list(ActivityCategory.objects.all())
+            self._by_slug = {category.slug: category for category in categories}
+            self._by_id = {category.pk: category for category in categories}
+            self._categories = categories
+            self._version = version
+
+    def all(self):
+        """Return every category, ordered by name"""
+        self._load()
+        return self._categories
+
+    def get(self, slug):
+        """Return the category with the given slug, or None"""
+        self._load()
+        return self._by_slug.get(slug)
+
+    def get_by_id(self, pk):
+        """Return the category with the given id, or None"""
+        self._load()
+        return self._by_id.get(pk)
+
+    def by_id(self):
+        """Return the {id: category} map"""
+        self._load()
+        return self._by_id
+
+    async def aget(self, slug):
+        """Async version of get(); a stale registry is reloaded in a worker thread"""
+        return await sync_to_async(self.get)(slug)
+
+    def invalidate(self):
+        """Force every process to reload its categories on the next lookup"""
+        cache.set(CATEGORY_VERSION_KEY, uuid.uuid4().hex, None)
+        self._version = None
+        self._checked_at = None
+
+
+category_registry = CategoryRegistry()
@@ -0,0 +1,141 @@
+"""
+Conditional GET for the activities JSON and fragment endpoints.
+
+Validators come from one aggregate over the activities a response is built
+from: the newest updated_at and the row count. Any create, edit or delete in
+that scope changes one of them, so a request carrying a matching
+If-None-Match or If-Modified-Since is answered with a 304 before the view
+runs its main query or renders a template. The (user, updated_at) index
+serves the aggregate without touching the table, and scopes whose cached
+payload is invalidated on every write (favorites) cache the aggregate with it.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import FAVORITES_CACHE_TIMEOUT, favorites_state_key
+from .categories import category_registry
+from .models import Activity
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+def list_scope(request, user):
+    """The AJAX list fragment depends on all of the user's activities and the query string"""
+    # The full page embeds forms and the category filter, so only the fragment is conditional
+    if not is_ajax(request):
+        return None
+    return Activity.objects.filter(user=user), request.GET.urlencode(), user.timezone, category_registry.version
+
+
+def detail_scope(request, user, pk):
+    """The detail JSON depends on one activity and its category"""
+    if not is_ajax(request):
+        return None
+    return Activity.objects.filter(pk=pk, user=user), category_registry.version
+
+
+def favorites_scope(request, user, category_slug):
+    """The favorites payload depends on the user's favorites in one category"""
+    return Activity.objects.filter(user=user, favorite=True, category__slug=category_slug), category_slug
+
+
+def favorites_state(request, user, category_slug):
+    """Cache key for the favorites aggregate, dropped together with the cached payload"""
+    return favorites_state_key(user.id, category_slug)
+
+
+def make_validators(state, key):
+    """Return the (ETag, Last-Modified timestamp) pair for an aggregated scope"""
+    updated_at = state['updated_at']
+    raw = '|'.join(str(part) for part in (updated_at and updated_at.isoformat(), state['count'], *key))
+    etag = quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+    return etag, int(updated_at.timestamp()) if updated_at else None
+
+
+def scope_state(queryset, cache_key=None):
+    state = cache.get(cache_key) if cache_key else None
+    if state is None:
+        state = queryset.aggregate(updated_at=Max('updated_at'), count=Count('id'))
+        if cache_key:
+            cache.set(cache_key, state, FAVORITES_CACHE_TIMEOUT)
+    return state
+
+
+async def ascope_state(queryset, cache_key=None):
+    state = await cache.aget(cache_key) if cache_key else None
+    if state is None:
+        state = await queryset.aaggregate(updated_at=Max('updated_at'), count=Count('id'))
+        if cache_key:
+            await cache.aset(cache_key, state, FAVORITES_CACHE_TIMEOUT)
+    return state
+
+
+def add_validators(response, etag, last_modified):
+    """Attach validators to a successful or not-modified response"""
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+        # Browsers must revalidate instead of guessing a freshness lifetime from Last-Modified
+        patch_cache_control(response, private=True, no_cache=True)
+    # The same URL serves HTML and AJAX responses
+    patch_vary_headers(response, ('X-Requested-With',))
+    return response
+
+
+def condition_on_activities(scope, state_key=None):
+    """
+    Like django.views.decorators.http.condition, with validators computed from
+    the activities returned by scope(request, user, *args, **kwargs).
+
+    scope returns (queryset, *key) where key holds anything else the response
+    depends on, or None to serve the request unconditionally. When given,
+    state_key(request, user, *args, **kwargs) names a cache entry for the
+    aggregate; whatever invalidates the response must delete it as well.
+    Works for sync and async views; apply it inside login_required.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                user = await request.auser()
+                scoped = scope(request, user, *args, **kwargs) if request.method in SAFE_METHODS else None
+                if scoped is None:
+                    return await view(request, *args, **kwargs)
+
+                queryset, *key = scoped
+                cache_key = state_key and state_key(request, user, *args, **kwargs)
+                etag, last_modified = make_validators(await ascope_state(queryset, cache_key), key)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return add_validators(response, etag, last_modified)
+        else:
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                user = request.user
+                scoped = scope(request, user, *args, **kwargs) if request.method in SAFE_METHODS else None
+                if scoped is None:
+                    return view(request, *args, **kwargs)
+
+                queryset, *key = scoped
+                cache_key = state_key and state_key(request, user, *args, **kwargs)
+                etag, last_modified = make_validators(scope_state(queryset, cache_key), key)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return add_validators(response, etag, last_modified)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import zlib
+
+from .importer import CSV_INGREDIENT_SEPARATOR
+from .models import Activity
+
+FORMATS = ('csv', 'jsonl')
+
+# Columns match what the importer reads, so an export can be imported again
+EXPORT_FIELDS = ['name', 'category', 'description', 'favorite', 'occurred_at', 'ingredients']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Rows are grouped into writes of roughly this many characters
+WRITE_SIZE = 64 * 1024
+
+
+def export_rows(user, chunk_size=2000):
+    """Yield one dict per activity of the user, reading the table in chunks"""
+    activities = Activity.objects.filter(user=user).for_list().order_by('occurred_at', 'id')
+    for activity in activities.iterator(chunk_size=chunk_size):
+        consumption = activity.current_consumption
+        if activity.category.slug == 'consume' and consumption is not None:
+            description = consumption.description
+            ingredients = consumption.ingredient_names
+        else:
+            description = activity.description
+            ingredients = []
+        yield {
+            'name': activity.name,
+            'category': activity.category.slug,
+            'description': description or '',
+            'favorite': activity.favorite,
+            'occurred_at': activity.occurred_at.isoformat(),
+            'ingredients': ingredients,
+        }
+
+
+def iter_csv(rows):
+    """Yield CSV text for the rows, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**row, 'ingredients': CSV_INGREDIENT_SEPARATOR.join(row['ingredients'])})
+        if buffer.tell() >= WRITE_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(rows):
+    """Yield JSON Lines text for the rows"""
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= WRITE_SIZE:
+            yield ''.join(lines)
+            lines, size = [], 0
+    yield ''.join(lines)
+
+
+def iter_export(user, format, compress=False, chunk_size=2000):
+    """Yield the user's export as bytes, optionally gzip-compressed"""
+    writer = {'csv': iter_csv, 'jsonl': iter_jsonl}[format]
+    chunks = (text.encode('utf-8') for text in writer(export_rows(user, chunk_size)))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def gzip_chunks(chunks):
+    """Gzip a stream of byte chunks without buffering the whole stream"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
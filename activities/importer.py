@@ -0,0 +1,244 @@
+import csv
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.timezones import get_zone, local_date
+from dashboard.rollups import add_counts_to_rollups
+from .cache import invalidate_favorites
+from .categories import category_registry
+from .models import Activity, Consumption, ConsumptionIngredient, Ingredient
+
+# CSV rows list ingredients in a single column
+CSV_INGREDIENT_SEPARATOR = ';'
+
+FORMATS = ('jsonl', 'csv')
+
+# Only the first errors are kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+# Longest name the Activity.name column accepts
+MAX_NAME_LENGTH = Activity._meta.get_field('name').max_length
+
+
+class ImportRowError(ValueError):
+    """Raised when an import row fails validation"""
+
+
+def text_field(row, key):
+    """Return a row's string value for key ('' when missing), rejecting other JSON types"""
+    value = row.get(key)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ImportRowError(f"{key.replace('_', ' ').capitalize()} must be a string")
+    return value
+
+
+def read_rows(lines, format):
+    """Yield (line number, row dict) pairs from an iterable of JSON Lines or CSV text lines"""
+    if format == 'jsonl':
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ImportRowError(f'Invalid JSON: {e}')
+                continue
+            yield line_number, row if isinstance(row, dict) else ImportRowError('Expected a JSON object')
+    elif format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            ingredients = row.get('ingredients') or ''
+            row['ingredients'] = [i for i in ingredients.split(CSV_INGREDIENT_SEPARATOR) if i.strip()]
+            yield reader.line_num, row
+    else:
+        raise ValueError(f'Unsupported import format: {format}')
+
+
+class ActivityImporter:
+    """
+    Bulk import activities for a single user.
+
+    Rows are validated against an in-memory category map and written with
+    bulk_create, one transaction per chunk.
+    """
+
+    def __init__(self, user, chunk_size=500):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.zone = get_zone(user.timezone)
+        self.categories = {category.slug: category for category in category_registry.all()}
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.touched_categories = set()
+
+    def run(self, rows):
+        """Import (line number, row) pairs and return a summary of the run"""
+        started = time.perf_counter()
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.import_chunk(chunk)
+        self.invalidate_caches()
+
+        elapsed = time.perf_counter() - started
+        return {
+            'created': self.created,
+            'errors': self.error_count,
+            'error_details': self.errors,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.created / elapsed) if elapsed else self.created,
+        }
+
+    def parse_row(self, row):
+        """Validate a row and return the unsaved Activity, consumption data and ingredients"""
+        if isinstance(row, ImportRowError):
+            raise row
+
+        name = text_field(row, 'name').strip()
+        slug = text_field(row, 'category')
+        category = self.categories.get(slug)
+        if not name:
+            raise ImportRowError('Name is required')
+        if len(name) > MAX_NAME_LENGTH:
+            raise ImportRowError(f'Name is longer than {MAX_NAME_LENGTH} characters')
+        if category is None:
+            raise ImportRowError(f'Category {slug} does not exist')
+
+        occurred_at = self.parse_occurred_at(row)
+        favorite = str(row.get('favorite', '')).lower() in ('1', 'true', 'yes', 'on')
+        description = text_field(row, 'description')
+        ingredients = (row.get('ingredients') or []) if category.slug == 'consume' else []
+        if not isinstance(ingredients, list) or not all(isinstance(i, str) for i in ingredients):
+            raise ImportRowError('Ingredients must be a list of strings')
+
+        activity = Activity(
+            user=self.user,
+            name=name,
+            category=category,
+            description=description if category.slug != 'consume' else None,
+            favorite=favorite,
+            occurred_at=occurred_at,
+            fingerprint=Activity.fingerprint_for(category, name, description, ingredients),
+        )
+        return activity, description, ingredients
+
+    def parse_occurred_at(self, row):
+        """Return the row's occurrence time as an aware datetime, defaulting to now"""
+        occurred_at, date, time_of_day = (text_field(row, key) for key in ('occurred_at', 'date', 'time'))
+        try:
+            if occurred_at:
+                value = datetime.fromisoformat(occurred_at)
+            elif date:
+                value = datetime.strptime(f"{date} {time_of_day or '00:00'}", '%Y-%m-%d %H:%M')
+            else:
+                return timezone.now()
+        except ValueError:
+            raise ImportRowError('Invalid date or time format')
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, self.zone)
+        return value
+
+    def import_chunk(self, chunk):
+        parsed = []
+        for line_number, row in chunk:
+            try:
+                parsed.append((line_number, *self.parse_row(row)))
+            except ImportRowError as e:
+                self.add_error(line_number, str(e))
+        self.save_parsed(parsed)
+
+    def save_parsed(self, parsed):
+        """
+        Bulk create parsed (line number, activity, description, ingredients) entries in one
+        transaction and return the (line number, activity) pairs that were created.
+        """
+        parsed = self.drop_duplicate_favorites(parsed)
+        if not parsed:
+            return []
+
+        try:
+            return self.bulk_save(parsed)
+        except IntegrityError:
+            # A concurrent request saved one of the favorites after the duplicate check;
+            # save entry by entry so only the duplicates fail
+            created = []
+            for entry in parsed:
+                entry[1].pk = None
+                try:
+                    created.extend(self.bulk_save([entry]))
+                except IntegrityError:
+                    self.add_error(entry[0], 'An identical favorite activity already exists')
+            return created
+
+    def bulk_save(self, parsed):
+        """Save parsed entries with bulk inserts in one transaction (a savepoint inside another)"""
+        with transaction.atomic():
+            activities = Activity.objects.bulk_create([activity for _, activity, _, _ in parsed])
+
+            consumption_rows = [
+                (Consumption(activity=activity, description=description, consumed_at=activity.occurred_at), ingredients)
+                for activity, (_, _, description, ingredients) in zip(activities, parsed)
+                if activity.category.slug == 'consume'
+            ]
+            consumptions = Consumption.objects.bulk_create([consumption for consumption, _ in consumption_rows])
+
+            resolved = Ingredient.objects.resolve(
+                name for _, ingredients in consumption_rows for name in ingredients
+            )
+            links = []
+            for consumption, (_, ingredients) in zip(consumptions, consumption_rows):
+                links.extend(
+                    ConsumptionIngredient(consumption=consumption, ingredient=resolved[key], name=name, position=position)
+                    for position, (key, name) in enumerate(Ingredient.names_by_key(ingredients).items())
+                )
+            ConsumptionIngredient.objects.bulk_create(links)
+
+            rollups = Counter(
+                (local_date(activity.occurred_at, self.user.timezone), activity.category_id)
+                for activity in activities
+            )
+            add_counts_to_rollups(self.user, rollups)
+
+        self.created += len(activities)
+        self.touched_categories.update(activity.category.slug for activity in activities)
+        return [(line_number, activity) for (line_number, *_), activity in zip(parsed, activities)]
+
+    def invalidate_caches(self):
+        """Drop cached favorites for every category that received activities"""
+        for slug in self.touched_categories:
+            invalidate_favorites(self.user.id, slug)
+
+    def drop_duplicate_favorites(self, parsed):
+        """Remove favorites that already exist or repeat within the chunk, recording them as errors"""
+        fingerprints = {activity.fingerprint for _, activity, _, _ in parsed if activity.favorite}
+        if not fingerprints:
+            return parsed
+
+        seen = set(
+            Activity.objects.filter(user=self.user, favorite=True, fingerprint__in=fingerprints)
+            .values_list('category_id', 'fingerprint')
+        )
+        kept = []
+        for entry in parsed:
+            line_number, activity = entry[0], entry[1]
+            if activity.favorite:
+                key = (activity.category_id, activity.fingerprint)
+                if key in seen:
+                    self.add_error(line_number, 'An identical favorite activity already exists')
+                    continue
+                seen.add(key)
+            kept.append(entry)
+        return kept
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'message': message})
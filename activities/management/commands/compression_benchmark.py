@@ -0,0 +1,34 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.compression import run
+from benchmarks.data import EMAIL_TEMPLATE
+
+
+class Command(BaseCommand):
+    help = 'Measure response sizes and CPU time of HTML minification and gzip/brotli on seeded pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=EMAIL_TEMPLATE.format(0), metavar='EMAIL',
+                            help='Seeded user to render pages as (default: the first seed_benchmark user)')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed runs per page and pipeline')
+        parser.add_argument('-o', '--output', help='Also write the results to this file')
+
+    def handle(self, *args, user, iterations, output=None, **options):
+        try:
+            user = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user: {user}; run manage.py seed_benchmark first')
+
+        try:
+            results = run(user, iterations=iterations)
+        except (RuntimeError, ValueError) as e:
+            raise CommandError(str(e))
+
+        report = json.dumps(results, indent=2)
+        self.stdout.write(report)
+        if output:
+            with open(output, 'w') as f:
+                f.write(report + '\n')
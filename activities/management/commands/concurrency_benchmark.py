@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.concurrency import run_asgi, run_wsgi
+from benchmarks.data import benchmark_users
+
+# Server mode -> (handler, LIFETRACKER_ASYNC_VIEWS)
+MODES = {
+    'wsgi': ('wsgi', '0'),
+    'asgi': ('asgi', '1'),
+    'asgi-sync': ('asgi', '0'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec of the activities JSON endpoints under WSGI and ASGI with many concurrent clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=[*MODES, 'all'], default='all',
+                            help="wsgi (sync views), asgi (async views), asgi-sync (sync views under ASGI) or all")
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent clients (default: 200)')
+        parser.add_argument('--requests', type=int, default=10, help='Requests per client (default: 10)')
+
+    def handle(self, *args, server, clients, requests, **options):
+        if server == 'all':
+            results = [self.run_in_subprocess(mode, clients, requests) for mode in MODES]
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        handler, async_views = MODES[server]
+        if settings.ASYNC_VIEWS != (async_views == '1'):
+            # The URLconf is already loaded with the other set of views
+            result = self.run_in_subprocess(server, clients, requests)
+        else:
+            users = list(benchmark_users())
+            if not users:
+                raise CommandError('No benchmark users; run manage.py seed_benchmark first')
+            run = run_asgi if handler == 'asgi' else run_wsgi
+            result = run(users, clients=clients, requests=requests)
+            result['mode'] = server
+        self.stdout.write(json.dumps(result, indent=2))
+
+    def run_in_subprocess(self, mode, clients, requests):
+        env = {**os.environ, 'LIFETRACKER_ASYNC_VIEWS': MODES[mode][1]}
+        process = subprocess.run(
+            [sys.executable, sys.argv[0], 'concurrency_benchmark', '--server', mode,
+             '--clients', str(clients), '--requests', str(requests)],
+            env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(f'{mode} run failed:\n{process.stderr}')
+        return json.loads(process.stdout)
@@ -0,0 +1,33 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.exporter import FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Export a user's full activity history as CSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, metavar='EMAIL', help='Email of the user to export')
+        parser.add_argument('--format', choices=FORMATS, default='csv', help='Output format (default: csv)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched from the database per query')
+        parser.add_argument('-o', '--output', default='-', help="Output file, or '-' for stdout")
+
+    def handle(self, *args, user, format, gzip, chunk_size, output, **options):
+        try:
+            user = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user: {user}')
+
+        chunks = iter_export(user, format, compress=gzip, chunk_size=chunk_size)
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(output, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.importer import FORMATS, ActivityImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import activities for a user from a JSON Lines or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--user', required=True, metavar='EMAIL', help='Email of the user to import for')
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per bulk insert transaction')
+
+    def handle(self, *args, path, user, format=None, chunk_size=500, **options):
+        try:
+            user = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user: {user}')
+
+        if format is None:
+            suffix = Path(path).suffix.lower().lstrip('.')
+            format = {'jsonl': 'jsonl', 'ndjson': 'jsonl', 'csv': 'csv'}.get(suffix)
+            if format is None:
+                raise CommandError('Cannot infer the format; pass --format')
+
+        importer = ActivityImporter(user, chunk_size=chunk_size)
+        if path == '-':
+            summary = importer.run(read_rows(sys.stdin, format))
+        else:
+            with open(path, newline='', encoding='utf-8') as f:
+                summary = importer.run(read_rows(f, format))
+
+        for error in summary['error_details']:
+            self.stderr.write(f"Line {error['line']}: {error['message']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} activities in {summary['seconds']}s "
+            f"({summary['rows_per_second']} rows/s), {summary['errors']} errors"
+        ))
@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.data import benchmark_users
+from benchmarks.load import run
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent create/list requests against the configured database and report throughput as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers (default: 8)')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per worker (default: 50)')
+        parser.add_argument('--write-ratio', type=float, default=0.5,
+                            help='Fraction of requests that create an activity (default: 0.5)')
+
+    def handle(self, *args, threads, requests, write_ratio, **options):
+        users = list(benchmark_users())
+        if not users:
+            raise CommandError('No benchmark users; run manage.py seed_benchmark first')
+
+        results = run(users, threads=threads, requests=requests, write_ratio=write_ratio)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from activities.search import install
+
+
+class Command(BaseCommand):
+    help = 'Recreate the activity search triggers and reindex every activity'
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.schema_editor(atomic=False) as schema_editor:
+            install(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f'Reindexed activities for {connection.vendor} search'))
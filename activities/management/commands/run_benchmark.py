@@ -0,0 +1,37 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.activities import run
+from benchmarks.data import EMAIL_TEMPLATE
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the activities views and print p50/p95 latency and query counts as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=EMAIL_TEMPLATE.format(0), metavar='EMAIL',
+                            help='Seeded user to benchmark as (default: the first seed_benchmark user)')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per case')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per case')
+        parser.add_argument('--case', action='append', dest='cases', metavar='NAME',
+                            help='Only run this case (may be repeated)')
+        parser.add_argument('-o', '--output', help='Also write the results to this file')
+
+    def handle(self, *args, user, iterations, warmup, cases=None, output=None, **options):
+        try:
+            user = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user: {user}; run manage.py seed_benchmark first')
+
+        try:
+            results = run(user, iterations=iterations, warmup=warmup, only=cases)
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        report = json.dumps(results, indent=2)
+        self.stdout.write(report)
+        if output:
+            with open(output, 'w') as f:
+                f.write(report + '\n')
@@ -0,0 +1,33 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.data import EMAIL_TEMPLATE
+from benchmarks.search import QUERIES, run
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text activity search against icontains scans and print the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=EMAIL_TEMPLATE.format(0), metavar='EMAIL',
+                            help='Seeded user to search as (default: the first seed_benchmark user)')
+        parser.add_argument('--query', action='append', dest='queries', metavar='TEXT',
+                            help=f'Search for this text (may be repeated; default: {", ".join(QUERIES)})')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed searches per query and strategy')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed searches per query and strategy')
+        parser.add_argument('-o', '--output', help='Also write the results to this file')
+
+    def handle(self, *args, user, queries, iterations, warmup, output=None, **options):
+        try:
+            user = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user: {user}; run manage.py seed_benchmark first')
+
+        results = run(user, queries=queries or QUERIES, iterations=iterations, warmup=warmup)
+        report = json.dumps(results, indent=2)
+        self.stdout.write(report)
+        if output:
+            with open(output, 'w') as f:
+                f.write(report + '\n')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks.data import PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = 'Generate benchmark users with synthetic activities, consumptions and ingredients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help='Number of users to create (default: 5)')
+        parser.add_argument('--activities', type=int, default=1000, help='Activities per user (default: 1000)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible data')
+
+    def handle(self, *args, users, activities, **options):
+        for user in seed(users=users, activities=activities, seed=options['seed']):
+            self.stdout.write(f'{user.email} ({user.timezone}): {user.activities.count()} activities')
+        self.stdout.write(self.style.SUCCESS(f'Seeded {users} users; password for all of them: {PASSWORD}'))
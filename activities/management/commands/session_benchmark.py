@@ -0,0 +1,38 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.data import EMAIL_TEMPLATE
+from benchmarks.sessions import run
+
+
+class Command(BaseCommand):
+    help = 'Compare database round trips and latency per page view under each session profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=EMAIL_TEMPLATE.format(0), metavar='EMAIL',
+                            help='Seeded user to browse as (default: the first seed_benchmark user)')
+        parser.add_argument('--profile', action='append', dest='profiles', choices=list(settings.SESSION_PROFILES),
+                            help='Only run this session profile (may be repeated)')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed page views per case')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed page views per case')
+        parser.add_argument('-o', '--output', help='Also write the results to this file')
+
+    def handle(self, *args, user, profiles, iterations, warmup, output=None, **options):
+        try:
+            user = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Unknown user: {user}; run manage.py seed_benchmark first')
+
+        try:
+            results = run(user, profiles=profiles, iterations=iterations, warmup=warmup)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        report = json.dumps(results, indent=2)
+        self.stdout.write(report)
+        if output:
+            with open(output, 'w') as f:
+                f.write(report + '\n')
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:09
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_occurred_at(apps, schema_editor):
+    """Copy the latest consumed_at onto each activity, falling back to created_at."""
+    Activity = apps.get_model('activities', 'Activity')
+    Consumption = apps.get_model('activities', 'Consumption')
+    latest_consumed_at = Consumption.objects.filter(
+        activity=OuterRef('pk')
+    ).order_by('-consumed_at').values('consumed_at')[:1]
+    Activity.objects.update(
+        occurred_at=Coalesce(Subquery(latest_consumed_at), F('created_at'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='occurred_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the activity happened (consumed_at for consumptions)'),
+        ),
+        migrations.RunPython(backfill_occurred_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', 'occurred_at'], name='activity_user_occurred_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_ingredients(apps, schema_editor):
+    """Split the newline-joined ingredients text into Ingredient and through rows."""
+    Consumption = apps.get_model('activities', 'Consumption')
+    Ingredient = apps.get_model('activities', 'Ingredient')
+    ConsumptionIngredient = apps.get_model('activities', 'ConsumptionIngredient')
+
+    entries = []
+    names_by_key = {}
+    for consumption_id, text in Consumption.objects.exclude(ingredients__isnull=True).exclude(ingredients='').values_list('id', 'ingredients').iterator():
+        keys = []
+        for line in text.split('\n'):
+            name = ' '.join(line.split())[:200]
+            key = name.lower()
+            if name and key not in keys:
+                keys.append(key)
+                names_by_key.setdefault(key, name)
+        entries.extend((consumption_id, key, position) for position, key in enumerate(keys))
+
+    Ingredient.objects.bulk_create(
+        [Ingredient(key=key, name=name) for key, name in names_by_key.items()],
+        batch_size=500,
+    )
+    ids_by_key = dict(Ingredient.objects.values_list('key', 'id'))
+    ConsumptionIngredient.objects.bulk_create(
+        [
+            ConsumptionIngredient(consumption_id=consumption_id, ingredient_id=ids_by_key[key], position=position)
+            for consumption_id, key, position in entries
+        ],
+        batch_size=500,
+    )
+
+
+def restore_ingredients_text(apps, schema_editor):
+    """Rebuild the newline-joined ingredients text from the through rows."""
+    Consumption = apps.get_model('activities', 'Consumption')
+    ConsumptionIngredient = apps.get_model('activities', 'ConsumptionIngredient')
+
+    names = {}
+    for consumption_id, name in ConsumptionIngredient.objects.order_by('consumption_id', 'position').values_list('consumption_id', 'ingredient__name').iterator():
+        names.setdefault(consumption_id, []).append(name)
+    for consumption_id, consumption_names in names.items():
+        Consumption.objects.filter(pk=consumption_id).update(ingredients='\n'.join(consumption_names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0003_activity_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('key', models.CharField(help_text='Lowercased, whitespace-normalized name', max_length=200, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConsumptionIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('consumption', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumption_ingredients', to='activities.consumption')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumption_ingredients', to='activities.ingredient')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='consumption',
+            name='ingredient_items',
+            field=models.ManyToManyField(blank=True, related_name='consumptions', through='activities.ConsumptionIngredient', to='activities.ingredient'),
+        ),
+        migrations.AddConstraint(
+            model_name='consumptioningredient',
+            constraint=models.UniqueConstraint(fields=('consumption', 'ingredient'), name='unique_consumption_ingredient'),
+        ),
+        migrations.RunPython(populate_ingredients, restore_ingredients_text),
+        migrations.RemoveField(
+            model_name='consumption',
+            name='ingredients',
+        ),
+    ]
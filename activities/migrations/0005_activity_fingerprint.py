@@ -0,0 +1,71 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:13
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def make_fingerprint(name, description, ingredient_keys):
+    parts = [
+        ' '.join((name or '').split()).lower(),
+        ' '.join((description or '').split()),
+        '\x1e'.join(sorted(set(ingredient_keys))),
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fingerprint every activity, then un-favorite duplicates so the constraint can be added."""
+    Activity = apps.get_model('activities', 'Activity')
+    Consumption = apps.get_model('activities', 'Consumption')
+    ConsumptionIngredient = apps.get_model('activities', 'ConsumptionIngredient')
+
+    # Latest consumption per activity, matching Activity.current_consumption
+    consumptions = {}
+    for consumption_id, activity_id, description in Consumption.objects.order_by('activity_id', '-consumed_at').values_list('id', 'activity_id', 'description'):
+        consumptions.setdefault(activity_id, (consumption_id, description))
+    ingredient_keys = {}
+    for consumption_id, key in ConsumptionIngredient.objects.values_list('consumption_id', 'ingredient__key'):
+        ingredient_keys.setdefault(consumption_id, []).append(key)
+
+    activities = []
+    seen = set()
+    duplicate_ids = []
+    for activity in Activity.objects.select_related('category').order_by('id').iterator():
+        if activity.category.slug == 'consume':
+            consumption_id, description = consumptions.get(activity.id, (None, ''))
+            activity.fingerprint = make_fingerprint(activity.name, description, ingredient_keys.get(consumption_id, []))
+        else:
+            activity.fingerprint = make_fingerprint(activity.name, activity.description, [])
+        activities.append(activity)
+
+        if activity.favorite:
+            key = (activity.user_id, activity.category_id, activity.fingerprint)
+            if key in seen:
+                duplicate_ids.append(activity.id)
+            seen.add(key)
+
+    Activity.objects.bulk_update(activities, ['fingerprint'], batch_size=500)
+    Activity.objects.filter(id__in=duplicate_ids).update(favorite=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0004_ingredient'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of the normalized name, description and ingredients', max_length=64),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='activity',
+            constraint=models.UniqueConstraint(condition=models.Q(('favorite', True)), fields=('user', 'category', 'fingerprint'), name='unique_favorite_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,263 @@
+"""
+Create the activities_search full-text index and the triggers that keep it in sync.
+
+The SQL is copied from activities.search as it stood when this migration was
+written, so later changes to that module don't alter what this migration
+installs; later schema changes get their own migrations.
+"""
+from django.db import migrations
+
+# The SQL that builds the (owner, name, body) document of the activities matching a WHERE clause
+SQLITE_DOCUMENT = """
+    SELECT a.id, 'u' || a.user_id, a.name,
+        coalesce(a.description, '')
+        || ' ' || coalesce((
+            SELECT group_concat(c.description, ' ') FROM activities_consumption c WHERE c.activity_id = a.id
+        ), '')
+        || ' ' || coalesce((
+            SELECT group_concat(i.name, ' ') FROM activities_consumption c
+            JOIN activities_consumptioningredient ci ON ci.consumption_id = c.id
+            JOIN activities_ingredient i ON i.id = ci.ingredient_id
+            WHERE c.activity_id = a.id
+        ), '')
+    FROM activities_activity a
+"""
+
+
+def sqlite_refresh(ids):
+    """Statements that rebuild the documents of the activity ids returned by an SQL expression"""
+    return f"""
+        DELETE FROM activities_search WHERE rowid IN ({ids});
+        INSERT INTO activities_search (rowid, owner, name, body) {SQLITE_DOCUMENT} WHERE a.id IN ({ids});
+    """
+
+
+def sqlite_ingredient_activities(ref):
+    return f'SELECT activity_id FROM activities_consumption WHERE id = {ref}.consumption_id'
+
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS activities_search USING fts5(
+        owner, name, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER activities_search_activity_insert AFTER INSERT ON activities_activity BEGIN
+        {sqlite_refresh('NEW.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_activity_update AFTER UPDATE OF name, description, user_id
+    ON activities_activity BEGIN
+        {sqlite_refresh('NEW.id')}
+    END
+    """,
+    """
+    CREATE TRIGGER activities_search_activity_delete AFTER DELETE ON activities_activity BEGIN
+        DELETE FROM activities_search WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_consumption_insert AFTER INSERT ON activities_consumption BEGIN
+        {sqlite_refresh('NEW.activity_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_consumption_update AFTER UPDATE OF description, activity_id
+    ON activities_consumption BEGIN
+        {sqlite_refresh('OLD.activity_id, NEW.activity_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_consumption_delete AFTER DELETE ON activities_consumption BEGIN
+        {sqlite_refresh('OLD.activity_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_link_insert AFTER INSERT ON activities_consumptioningredient BEGIN
+        {sqlite_refresh(sqlite_ingredient_activities('NEW'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_link_update AFTER UPDATE ON activities_consumptioningredient BEGIN
+        {sqlite_refresh(sqlite_ingredient_activities('OLD'))}
+        {sqlite_refresh(sqlite_ingredient_activities('NEW'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_link_delete AFTER DELETE ON activities_consumptioningredient BEGIN
+        {sqlite_refresh(sqlite_ingredient_activities('OLD'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_update AFTER UPDATE OF name ON activities_ingredient BEGIN
+        {sqlite_refresh('''
+            SELECT c.activity_id FROM activities_consumption c
+            JOIN activities_consumptioningredient ci ON ci.consumption_id = c.id
+            WHERE ci.ingredient_id = NEW.id
+        ''')}
+    END
+    """,
+    'DELETE FROM activities_search',
+    f'INSERT INTO activities_search (rowid, owner, name, body) {SQLITE_DOCUMENT}',
+]
+
+SQLITE_TRIGGERS = [
+    'activities_search_activity_insert', 'activities_search_activity_update', 'activities_search_activity_delete',
+    'activities_search_consumption_insert', 'activities_search_consumption_update',
+    'activities_search_consumption_delete', 'activities_search_ingredient_link_insert',
+    'activities_search_ingredient_link_update', 'activities_search_ingredient_link_delete',
+    'activities_search_ingredient_update',
+]
+
+SQLITE_UNINSTALL = [
+    *(f'DROP TRIGGER IF EXISTS {name}' for name in SQLITE_TRIGGERS),
+    'DROP TABLE IF EXISTS activities_search',
+]
+
+POSTGRES_INSTALL = [
+    """
+    CREATE TABLE IF NOT EXISTS activities_search (
+        activity_id bigint PRIMARY KEY,
+        user_id bigint NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS activities_search_document_idx ON activities_search USING gin (document)',
+    'CREATE INDEX IF NOT EXISTS activities_search_user_idx ON activities_search (user_id)',
+    """
+    CREATE OR REPLACE FUNCTION activities_search_refresh(ids bigint[]) RETURNS void AS $$
+        DELETE FROM activities_search WHERE activity_id = ANY(ids);
+        INSERT INTO activities_search (activity_id, user_id, document)
+        SELECT a.id, a.user_id,
+            setweight(to_tsvector('simple', a.name), 'A')
+            || setweight(to_tsvector('simple', concat_ws(' ',
+                a.description,
+                (SELECT string_agg(c.description, ' ') FROM activities_consumption c WHERE c.activity_id = a.id),
+                (SELECT string_agg(i.name, ' ') FROM activities_consumption c
+                    JOIN activities_consumptioningredient ci ON ci.consumption_id = c.id
+                    JOIN activities_ingredient i ON i.id = ci.ingredient_id
+                    WHERE c.activity_id = a.id)
+            )), 'B')
+        FROM activities_activity a WHERE a.id = ANY(ids);
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_activity() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM activities_search WHERE activity_id = OLD.id;
+        ELSE
+            PERFORM activities_search_refresh(ARRAY[NEW.id]);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_consumption() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM activities_search_refresh(ARRAY[OLD.activity_id]);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM activities_search_refresh(ARRAY[NEW.activity_id]);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_ingredient_link() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM activities_search_refresh(
+                ARRAY(SELECT activity_id FROM activities_consumption WHERE id = OLD.consumption_id)
+            );
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM activities_search_refresh(
+                ARRAY(SELECT activity_id FROM activities_consumption WHERE id = NEW.consumption_id)
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_ingredient() RETURNS trigger AS $$
+    BEGIN
+        PERFORM activities_search_refresh(ARRAY(
+            SELECT c.activity_id FROM activities_consumption c
+            JOIN activities_consumptioningredient ci ON ci.consumption_id = c.id
+            WHERE ci.ingredient_id = NEW.id
+        ));
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_activity ON activities_activity',
+    """
+    CREATE TRIGGER activities_search_activity
+    AFTER INSERT OR DELETE OR UPDATE OF name, description, user_id ON activities_activity
+    FOR EACH ROW EXECUTE FUNCTION activities_search_activity()
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_consumption ON activities_consumption',
+    """
+    CREATE TRIGGER activities_search_consumption
+    AFTER INSERT OR DELETE OR UPDATE OF description, activity_id ON activities_consumption
+    FOR EACH ROW EXECUTE FUNCTION activities_search_consumption()
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_ingredient_link ON activities_consumptioningredient',
+    """
+    CREATE TRIGGER activities_search_ingredient_link
+    AFTER INSERT OR DELETE OR UPDATE ON activities_consumptioningredient
+    FOR EACH ROW EXECUTE FUNCTION activities_search_ingredient_link()
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_ingredient ON activities_ingredient',
+    """
+    CREATE TRIGGER activities_search_ingredient
+    AFTER UPDATE OF name ON activities_ingredient
+    FOR EACH ROW EXECUTE FUNCTION activities_search_ingredient()
+    """,
+    'SELECT activities_search_refresh(ARRAY(SELECT id FROM activities_activity))',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS activities_search_activity ON activities_activity',
+    'DROP TRIGGER IF EXISTS activities_search_consumption ON activities_consumption',
+    'DROP TRIGGER IF EXISTS activities_search_ingredient_link ON activities_consumptioningredient',
+    'DROP TRIGGER IF EXISTS activities_search_ingredient ON activities_ingredient',
+    'DROP FUNCTION IF EXISTS activities_search_activity()',
+    'DROP FUNCTION IF EXISTS activities_search_consumption()',
+    'DROP FUNCTION IF EXISTS activities_search_ingredient_link()',
+    'DROP FUNCTION IF EXISTS activities_search_ingredient()',
+    'DROP FUNCTION IF EXISTS activities_search_refresh(bigint[])',
+    'DROP TABLE IF EXISTS activities_search',
+]
+
+
+INSTALL = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}
+UNINSTALL = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}
+
+
+def install_search(apps, schema_editor):
+    for statement in INSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def uninstall_search(apps, schema_editor):
+    for statement in UNINSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0006_activity_user_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -21,6 +23,44 @@ class ActivityCategory(models.Model):
     def __str__(self):
         return self.name
 
+class RegistryCategoryIterable(models.query.ModelIterable):
+    """Yield activities with their category attached from the category registry instead of a join"""
+
+    def __iter__(self):
+        from .categories import category_registry
+
+        categories = category_registry.by_id()
+        for activity in super().__iter__():
+            category = categories.get(activity.category_id)
+            if category is not None:
+                activity.category = category
+            yield activity
+
+class ActivityQuerySet(models.QuerySet):
+    """QuerySet for activities"""
+
+    def with_categories(self):
+        """Attach categories from the in-process registry rather than querying them"""
+        clone = self._chain()
+        clone._iterable_class = RegistryCategoryIterable
+        return clone
+
+    def for_list(self):
+        """Attach the category and prefetch each activity's consumptions and their ingredients"""
+        return self.with_categories().prefetch_related(
+            models.Prefetch(
+                "consumptions",
+                queryset=Consumption.objects.order_by("-consumed_at").prefetch_related("consumption_ingredients"),
+                to_attr="prefetched_consumptions",
+            )
+        )
+    
+    def containing_ingredient(self, name):
+        """Filter to activities with a consumption that contains the given ingredient"""
+        return self.filter(
+            consumptions__ingredient_items__key=Ingredient.make_key(name)
+        ).distinct()
+
 class Activity(models.Model):
     """Base model for all activities"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="activities")
@@ -28,28 +68,159 @@ class Activity(models.Model):
     category = models.ForeignKey(ActivityCategory, on_delete=models.CASCADE, related_name="activities")
     description = models.TextField(blank=True, null=True)
     favorite = models.BooleanField(default=False)
+    occurred_at = models.DateTimeField(default=timezone.now, help_text="When the activity happened (consumed_at for consumptions)")
+    fingerprint = models.CharField(max_length=64, blank=True, default="", help_text="Hash of the normalized name, description and ingredients")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ActivityQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Activities"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "occurred_at"], name="activity_user_occurred_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="activity_user_created_idx"),
+            models.Index(fields=["user", "updated_at"], name="activity_user_updated_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category", "fingerprint"],
+                condition=models.Q(favorite=True),
+                name="unique_favorite_fingerprint",
+            ),
+        ]
     
     def __str__(self):
         return self.name
     
     def get_absolute_url(self):
         return reverse("activities:activity_detail", kwargs={"pk": self.pk})
+    
+    @staticmethod
+    def make_fingerprint(name, description="", ingredients=()):
+        """Return a hash identifying an activity by its normalized name, description and ingredients"""
+        parts = [
+            " ".join((name or "").split()).lower(),
+            " ".join((description or "").split()),
+            "\x1e".join(sorted({Ingredient.make_key(i) for i in ingredients if i.strip()})),
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+    
+    @classmethod
+    def fingerprint_for(cls, category, name, description="", ingredients=()):
+        """
+        Return the fingerprint of an activity in the category. Consume activities are identified by
+        their consumption's description and ingredients, others by their own description.
+        """
+        if category.slug != "consume":
+            ingredients = ()
+        return cls.make_fingerprint(name, description, ingredients)
+    
+    @property
+    def current_consumption(self):
+        """Return the most recent consumption, using the prefetched list when available"""
+        if hasattr(self, "prefetched_consumptions"):
+            return self.prefetched_consumptions[0] if self.prefetched_consumptions else None
+        return self.consumptions.first()
+
+# Ingredient names longer than this are cut, as the 0004 data migration did
+INGREDIENT_NAME_LENGTH = 200
+
+class IngredientQuerySet(models.QuerySet):
+    """QuerySet for ingredients"""
+    
+    def resolve(self, names):
+        """Return an ordered {key: Ingredient} map for the given names, bulk creating any that are missing"""
+        names_by_key = Ingredient.names_by_key(names)
+        
+        ingredients = {i.key: i for i in self.filter(key__in=names_by_key)}
+        missing = [Ingredient(key=key, name=name) for key, name in names_by_key.items() if key not in ingredients]
+        if missing:
+            # Ignore conflicts so concurrent writers creating the same ingredient don't fail
+            self.bulk_create(missing, ignore_conflicts=True)
+            ingredients.update({i.key: i for i in self.filter(key__in=[i.key for i in missing])})
+        # Preserve the order the names were given in
+        return {key: ingredients[key] for key in names_by_key}
+
+class Ingredient(models.Model):
+    """Model for a canonical ingredient shared across consumptions"""
+    name = models.CharField(max_length=INGREDIENT_NAME_LENGTH)
+    key = models.CharField(max_length=INGREDIENT_NAME_LENGTH, unique=True, help_text="Lowercased, whitespace-normalized name")
+    
+    objects = IngredientQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ["name"]
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def clean_name(name):
+        """Collapse runs of whitespace in an ingredient name and cut it to the column length"""
+        return " ".join(name.split())[:INGREDIENT_NAME_LENGTH].rstrip()
+    
+    @classmethod
+    def make_key(cls, name):
+        """Return the canonical lookup key for an ingredient name"""
+        return cls.clean_name(name).lower()
+    
+    @classmethod
+    def names_by_key(cls, names):
+        """Return an ordered {key: cleaned name} map of the non-blank names, keeping the first spelling of each key"""
+        names_by_key = {}
+        for name in names:
+            name = cls.clean_name(name)
+            if name:
+                names_by_key.setdefault(cls.make_key(name), name)
+        return names_by_key
 
 class Consumption(models.Model):
     """Model for consumption activities"""
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name="consumptions")
     description = models.TextField(blank=True, null=True)
-    ingredients = models.TextField(blank=True, null=True, help_text="Enter ingredients, one per line")
+    ingredient_items = models.ManyToManyField(Ingredient, through="ConsumptionIngredient", related_name="consumptions", blank=True)
     consumed_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ["-consumed_at"]
     
     def __str__(self):
-        return f"{self.activity.name} consumed at {self.consumed_at}" 
\ No newline at end of file
+        return f"{self.activity.name} consumed at {self.consumed_at}"
+    
+    @property
+    def ingredient_names(self):
+        """Return ingredient names as entered, in entry order, using prefetched rows when available"""
+        return [entry.name for entry in self.consumption_ingredients.all()]
+    
+    def set_ingredients(self, names):
+        """Replace this consumption's ingredients with the given names"""
+        names_by_key = Ingredient.names_by_key(names)
+        ingredients = Ingredient.objects.resolve(names_by_key.values())
+        self.consumption_ingredients.all().delete()
+        ConsumptionIngredient.objects.bulk_create([
+            ConsumptionIngredient(consumption=self, ingredient=ingredients[key], name=name, position=position)
+            for position, (key, name) in enumerate(names_by_key.items())
+        ])
+
+class ConsumptionIngredient(models.Model):
+    """Through model linking a consumption to its ingredients, in entry order"""
+    consumption = models.ForeignKey(Consumption, on_delete=models.CASCADE, related_name="consumption_ingredients")
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name="consumption_ingredients")
+    name = models.CharField(max_length=INGREDIENT_NAME_LENGTH, blank=True, help_text="The name as the user entered it; defaults to the ingredient's name")
+    position = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["consumption", "ingredient"], name="unique_consumption_ingredient"),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} in {self.consumption}"
+    
+    def save(self, *args, **kwargs):
+        if not self.name:
+            self.name = self.ingredient.name
+        super().save(*args, **kwargs) 
\ No newline at end of file
@@ -0,0 +1,44 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(activity):
+    """Encode an activity's (created_at, id) position as an opaque cursor"""
+    raw = f"{activity.created_at.isoformat()}|{activity.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor back into a (created_at, id) tuple"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor}')
+
+
+def paginate_by_cursor(queryset, cursor=None, per_page=15):
+    """
+    Return one page of activities after the cursor and the cursor for the next page.
+
+    Seeks on (created_at, id) instead of using OFFSET, and fetches one extra row
+    rather than counting, so every page costs a single indexed query.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = encode_cursor(items[per_page - 1]) if len(items) > per_page else None
+    return items[:per_page], next_cursor
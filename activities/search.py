@@ -0,0 +1,311 @@
+"""
+Ranked full-text search over a user's activities.
+
+Each activity has one document in the activities_search table built from its
+name, description, consumption descriptions and ingredient names. On SQLite
+the table is an FTS5 virtual table; on PostgreSQL it holds a weighted
+tsvector with a GIN index. Database triggers rebuild an activity's document
+whenever any of those rows change, so bulk inserts, queryset updates and
+cascading deletes keep the index in sync without going through Django
+signals.
+
+SQLite drops a table's triggers when a migration rebuilds the table; run
+`manage.py rebuild_search_index` (or call install()) after such a migration.
+Other database backends fall back to an icontains scan.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Activity
+
+# Search terms beyond this are ignored
+MAX_TERMS = 8
+
+TERM_RE = re.compile(r'\w+')
+
+# The SQL that builds the (owner, name, body) document of the activities matching a WHERE clause
+SQLITE_DOCUMENT = """
+    SELECT a.id, 'u' || a.user_id, a.name,
+        coalesce(a.description, '')
+        || ' ' || coalesce((
+            SELECT group_concat(c.description, ' ') FROM activities_consumption c WHERE c.activity_id = a.id
+        ), '')
+        || ' ' || coalesce((
+            SELECT group_concat(ci.name, ' ') FROM activities_consumption c
+            JOIN activities_consumptioningredient ci ON ci.consumption_id = c.id
+            WHERE c.activity_id = a.id
+        ), '')
+    FROM activities_activity a
+"""
+
+
+def sqlite_refresh(ids):
+    """Statements that rebuild the documents of the activity ids returned by an SQL expression"""
+    return f"""
+        DELETE FROM activities_search WHERE rowid IN ({ids});
+        INSERT INTO activities_search (rowid, owner, name, body) {SQLITE_DOCUMENT} WHERE a.id IN ({ids});
+    """
+
+
+def sqlite_ingredient_activities(ref):
+    return f'SELECT activity_id FROM activities_consumption WHERE id = {ref}.consumption_id'
+
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS activities_search USING fts5(
+        owner, name, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER activities_search_activity_insert AFTER INSERT ON activities_activity BEGIN
+        {sqlite_refresh('NEW.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_activity_update AFTER UPDATE OF name, description, user_id
+    ON activities_activity BEGIN
+        {sqlite_refresh('NEW.id')}
+    END
+    """,
+    """
+    CREATE TRIGGER activities_search_activity_delete AFTER DELETE ON activities_activity BEGIN
+        DELETE FROM activities_search WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_consumption_insert AFTER INSERT ON activities_consumption BEGIN
+        {sqlite_refresh('NEW.activity_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_consumption_update AFTER UPDATE OF description, activity_id
+    ON activities_consumption BEGIN
+        {sqlite_refresh('OLD.activity_id, NEW.activity_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_consumption_delete AFTER DELETE ON activities_consumption BEGIN
+        {sqlite_refresh('OLD.activity_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_link_insert AFTER INSERT ON activities_consumptioningredient BEGIN
+        {sqlite_refresh(sqlite_ingredient_activities('NEW'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_link_update AFTER UPDATE ON activities_consumptioningredient BEGIN
+        {sqlite_refresh(sqlite_ingredient_activities('OLD'))}
+        {sqlite_refresh(sqlite_ingredient_activities('NEW'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER activities_search_ingredient_link_delete AFTER DELETE ON activities_consumptioningredient BEGIN
+        {sqlite_refresh(sqlite_ingredient_activities('OLD'))}
+    END
+    """,
+    'DELETE FROM activities_search',
+    f'INSERT INTO activities_search (rowid, owner, name, body) {SQLITE_DOCUMENT}',
+]
+
+SQLITE_TRIGGERS = [
+    'activities_search_activity_insert', 'activities_search_activity_update', 'activities_search_activity_delete',
+    'activities_search_consumption_insert', 'activities_search_consumption_update',
+    'activities_search_consumption_delete', 'activities_search_ingredient_link_insert',
+    'activities_search_ingredient_link_update', 'activities_search_ingredient_link_delete',
+]
+
+SQLITE_UNINSTALL = [
+    *(f'DROP TRIGGER IF EXISTS {name}' for name in SQLITE_TRIGGERS),
+    'DROP TABLE IF EXISTS activities_search',
+]
+
+POSTGRES_INSTALL = [
+    """
+    CREATE TABLE IF NOT EXISTS activities_search (
+        activity_id bigint PRIMARY KEY,
+        user_id bigint NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS activities_search_document_idx ON activities_search USING gin (document)',
+    'CREATE INDEX IF NOT EXISTS activities_search_user_idx ON activities_search (user_id)',
+    """
+    CREATE OR REPLACE FUNCTION activities_search_refresh(ids bigint[]) RETURNS void AS $$
+        DELETE FROM activities_search WHERE activity_id = ANY(ids);
+        INSERT INTO activities_search (activity_id, user_id, document)
+        SELECT a.id, a.user_id,
+            setweight(to_tsvector('simple', a.name), 'A')
+            || setweight(to_tsvector('simple', concat_ws(' ',
+                a.description,
+                (SELECT string_agg(c.description, ' ') FROM activities_consumption c WHERE c.activity_id = a.id),
+                (SELECT string_agg(ci.name, ' ') FROM activities_consumption c
+                    JOIN activities_consumptioningredient ci ON ci.consumption_id = c.id
+                    WHERE c.activity_id = a.id)
+            )), 'B')
+        FROM activities_activity a WHERE a.id = ANY(ids);
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_activity() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM activities_search WHERE activity_id = OLD.id;
+        ELSE
+            PERFORM activities_search_refresh(ARRAY[NEW.id]);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_consumption() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM activities_search_refresh(ARRAY[OLD.activity_id]);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM activities_search_refresh(ARRAY[NEW.activity_id]);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION activities_search_ingredient_link() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM activities_search_refresh(
+                ARRAY(SELECT activity_id FROM activities_consumption WHERE id = OLD.consumption_id)
+            );
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM activities_search_refresh(
+                ARRAY(SELECT activity_id FROM activities_consumption WHERE id = NEW.consumption_id)
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_activity ON activities_activity',
+    """
+    CREATE TRIGGER activities_search_activity
+    AFTER INSERT OR DELETE OR UPDATE OF name, description, user_id ON activities_activity
+    FOR EACH ROW EXECUTE FUNCTION activities_search_activity()
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_consumption ON activities_consumption',
+    """
+    CREATE TRIGGER activities_search_consumption
+    AFTER INSERT OR DELETE OR UPDATE OF description, activity_id ON activities_consumption
+    FOR EACH ROW EXECUTE FUNCTION activities_search_consumption()
+    """,
+    'DROP TRIGGER IF EXISTS activities_search_ingredient_link ON activities_consumptioningredient',
+    """
+    CREATE TRIGGER activities_search_ingredient_link
+    AFTER INSERT OR DELETE OR UPDATE ON activities_consumptioningredient
+    FOR EACH ROW EXECUTE FUNCTION activities_search_ingredient_link()
+    """,
+    'SELECT activities_search_refresh(ARRAY(SELECT id FROM activities_activity))',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS activities_search_activity ON activities_activity',
+    'DROP TRIGGER IF EXISTS activities_search_consumption ON activities_consumption',
+    'DROP TRIGGER IF EXISTS activities_search_ingredient_link ON activities_consumptioningredient',
+    'DROP FUNCTION IF EXISTS activities_search_activity()',
+    'DROP FUNCTION IF EXISTS activities_search_consumption()',
+    'DROP FUNCTION IF EXISTS activities_search_ingredient_link()',
+    'DROP FUNCTION IF EXISTS activities_search_refresh(bigint[])',
+    'DROP TABLE IF EXISTS activities_search',
+]
+
+INSTALL = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}
+UNINSTALL = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}
+
+
+def install(schema_editor):
+    """Create the search table and triggers and index every existing activity"""
+    vendor = schema_editor.connection.vendor
+    # Recreate the triggers from scratch so a reinstall picks up any that a table rebuild dropped
+    if vendor == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    for statement in INSTALL.get(vendor, []):
+        schema_editor.execute(statement)
+
+
+def uninstall(schema_editor):
+    """Drop the search table and triggers"""
+    for statement in UNINSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def search_terms(query):
+    """Split a user query into at most MAX_TERMS lowercase word terms"""
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def ranked_ids(user, terms, limit, offset=0):
+    """Return the ids of the user's activities matching every term (as a prefix), best match first"""
+    if connection.vendor == 'sqlite':
+        # Terms only match the name and body columns; the owner column scopes the match to the user
+        prefixes = ' AND '.join(f'"{term}"*' for term in terms)
+        match = f'owner:u{user.pk} AND {{name body}}: ({prefixes})'
+        sql = """
+            SELECT rowid FROM activities_search WHERE activities_search MATCH %s
+            ORDER BY bm25(activities_search, 0.0, 10.0, 1.0), rowid DESC LIMIT %s OFFSET %s
+        """
+        params = [match, limit, offset]
+    else:
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        sql = """
+            SELECT activity_id FROM activities_search
+            WHERE user_id = %s AND document @@ to_tsquery('simple', %s)
+            ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC, activity_id DESC LIMIT %s OFFSET %s
+        """
+        params = [user.pk, tsquery, tsquery, limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def icontains_queryset(user, terms):
+    """The user's activities containing every term in any searched field, using LIKE scans"""
+    queryset = Activity.objects.filter(user=user)
+    for term in terms:
+        queryset = queryset.filter(
+            Q(name__icontains=term)
+            | Q(description__icontains=term)
+            | Q(consumptions__description__icontains=term)
+            | Q(consumptions__consumption_ingredients__name__icontains=term)
+        )
+    return queryset.distinct()
+
+
+def search(user, query, page=1, per_page=15):
+    """
+    Return one page of the user's activities matching the query, best match
+    first, and whether there is a next page.
+
+    Fetches one extra id instead of counting matches, like paginate_by_cursor.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    offset = (page - 1) * per_page
+    if connection.vendor in INSTALL:
+        ids = ranked_ids(user, terms, per_page + 1, offset)
+    else:
+        queryset = icontains_queryset(user, terms).order_by('-created_at', '-id')
+        ids = list(queryset.values_list('id', flat=True)[offset:offset + per_page + 1])
+
+    has_next = len(ids) > per_page
+    ids = ids[:per_page]
+    activities = Activity.objects.for_list().in_bulk(ids)
+    return [activities[pk] for pk in ids if pk in activities], has_next
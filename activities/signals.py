@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate_favorites
+from .categories import category_registry
+from .models import Activity, ActivityCategory, Consumption, Ingredient
+
+
+def invalidate_favorites_on_commit(activity):
+    """Invalidate the activity's cached favorites once the current transaction commits"""
+    category = category_registry.get_by_id(activity.category_id) or activity.category
+    user_id, category_slug = activity.user_id, category.slug
+    transaction.on_commit(lambda: invalidate_favorites(user_id, category_slug))
+
+
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+def activity_changed(sender, instance, **kwargs):
+    invalidate_favorites_on_commit(instance)
+
+
+@receiver(post_save, sender=Consumption)
+@receiver(post_delete, sender=Consumption)
+def consumption_changed(sender, instance, **kwargs):
+    invalidate_favorites_on_commit(instance.activity)
+
+
+def refresh_favorite_fingerprints(favorites):
+    """
+    Recompute the fingerprints of consume favorites from their current consumption.
+
+    A favorite that now matches another favorite of its owner is un-favorited,
+    as the 0005 backfill did, so the unique fingerprint constraint still holds.
+    """
+    favorites = list(favorites.for_list().order_by('id'))
+    for activity in favorites:
+        consumption = activity.current_consumption
+        activity.fingerprint = Activity.fingerprint_for(
+            activity.category,
+            activity.name,
+            consumption.description if consumption else '',
+            consumption.ingredient_names if consumption else [],
+        )
+
+    ids = [activity.id for activity in favorites]
+    seen = set(
+        Activity.objects.filter(favorite=True, fingerprint__in=[activity.fingerprint for activity in favorites])
+        .exclude(id__in=ids)
+        .values_list('user_id', 'category_id', 'fingerprint')
+    )
+    for activity in favorites:
+        key = (activity.user_id, activity.category_id, activity.fingerprint)
+        if key in seen:
+            activity.favorite = False
+        seen.add(key)
+    # Un-favorite first so no intermediate row breaks the constraint
+    Activity.objects.filter(id__in=[activity.id for activity in favorites if not activity.favorite]).update(favorite=False)
+    Activity.objects.bulk_update(favorites, ['fingerprint'])
+
+
+@receiver(pre_delete, sender=Ingredient)
+def ingredient_deleting(sender, instance, **kwargs):
+    # Find the activities before the delete cascades to the links that lead to them
+    instance.activity_ids = list(
+        Activity.objects.filter(consumptions__ingredient_items=instance).values_list('pk', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    # Renaming an ingredient changes nothing users see, since they see the names they entered
+    activities = Activity.objects.filter(pk__in=getattr(instance, 'activity_ids', []))
+    refresh_favorite_fingerprints(activities.filter(favorite=True))
+    # Bump updated_at so the cached list cards and conditional GET validators change too
+    activities.update(updated_at=timezone.now())
+    for user_id, category_slug in set(activities.values_list('user_id', 'category__slug')):
+        transaction.on_commit(lambda user_id=user_id, category_slug=category_slug: invalidate_favorites(user_id, category_slug))
+
+
+@receiver(post_save, sender=ActivityCategory)
+@receiver(post_delete, sender=ActivityCategory)
+def category_changed(sender, **kwargs):
+    # Reload right away for this process, and again once the change is visible to other workers
+    category_registry.invalidate()
+    transaction.on_commit(category_registry.invalidate)
@@ -0,0 +1,715 @@
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.db.models import F
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import async_views, views
+from .categories import CATEGORY_VERSION_KEY, CategoryRegistry, category_registry
+from .importer import ActivityImporter
+from .models import Activity, ActivityCategory, Consumption, Ingredient
+
+User = get_user_model()
+
+
+class ActivitiesViewTestCase(TestCase):
+    """Tests for the activities list page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+        cls.exercise = ActivityCategory.objects.create(name='Exercise', slug='exercise', color='blue')
+
+    def setUp(self):
+        caches['template_fragments'].clear()
+        self.client.force_login(self.user)
+
+    def create_activities(self, count):
+        for i in range(count):
+            category = self.consume if i % 2 == 0 else self.exercise
+            activity = Activity.objects.create(user=self.user, name=f'Activity {i}', category=category)
+            if category == self.consume:
+                consumption = Consumption.objects.create(activity=activity, description='Meal')
+                consumption.set_ingredients(['Eggs', 'Toast'])
+
+    def count_list_queries(self, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('activities:list'), **headers)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.create_activities(1)
+        single = self.count_list_queries()
+        ajax_single = self.count_list_queries(HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        self.create_activities(14)
+        self.assertEqual(self.count_list_queries(), single)
+        self.assertEqual(self.count_list_queries(HTTP_X_REQUESTED_WITH='XMLHttpRequest'), ajax_single)
+
+    def test_page_links_cover_nearby_pages_only(self):
+        Activity.objects.bulk_create([
+            Activity(user=self.user, name=f'Activity {i}', category=self.exercise) for i in range(15 * 8)
+        ])
+        response = self.client.get(reverse('activities:list'), {'page': 4})
+        self.assertEqual(list(response.context['page_numbers']), [2, 3, 4, 5, 6])
+
+        response = self.client.get(reverse('activities:list'), {'page': 8})
+        self.assertEqual(list(response.context['page_numbers']), [6, 7, 8])
+
+    def test_list_renders_current_consumption(self):
+        self.create_activities(1)
+        response = self.client.get(reverse('activities:list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(response, 'Eggs')
+        self.assertContains(response, 'Toast')
+
+    def test_cards_are_cached_until_the_activity_changes(self):
+        self.create_activities(1)
+        activity = Activity.objects.get()
+        url = reverse('activities:list')
+        self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        # A queryset update leaves updated_at alone, so the cached card is served
+        Activity.objects.filter(pk=activity.pk).update(name='Renamed')
+        self.assertNotContains(self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'), 'Renamed')
+
+        activity.refresh_from_db()
+        activity.save()
+        self.assertContains(self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'), 'Renamed')
+
+        self.user.timezone = 'Asia/Tokyo'
+        self.user.save()
+        Activity.objects.filter(pk=activity.pk).update(name='Renamed again')
+        self.assertContains(self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'), 'Renamed again')
+
+    def test_date_filter_uses_consumption_time(self):
+        response = self.client.post(
+            reverse('activities:create'),
+            data={'name': 'Late snack', 'category': 'consume', 'date': '2025-03-01', 'time': '23:30'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse('activities:list'), {'date': '2025-03-01'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(response, 'Late snack')
+        response = self.client.get(reverse('activities:list'), {'date': '2025-03-02'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertNotContains(response, 'Late snack')
+
+    def test_cursor_pagination_walks_every_activity_once(self):
+        self.create_activities(20)
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(reverse('activities:list'), {'cursor': cursor}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            self.assertEqual(response.status_code, 200)
+            seen.extend(activity.pk for activity in response.context['activities'])
+            cursor = response.get('X-Next-Cursor')
+            if not cursor:
+                break
+
+        expected = list(Activity.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_full_page_starts_infinite_scroll(self):
+        self.create_activities(20)
+        response = self.client.get(reverse('activities:list'))
+        first_page = [activity.pk for activity in response.context['activities']]
+        cursor = response.context['next_cursor']
+        self.assertContains(response, f'id="activities-list" data-next-cursor="{cursor}"')
+
+        # The cursor continues exactly where the numbered page ends
+        response = self.client.get(reverse('activities:list'), {'cursor': cursor}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        rest = [activity.pk for activity in response.context['activities']]
+        expected = list(Activity.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(first_page + rest, expected)
+
+        response = self.client.get(reverse('activities:list'), {'page': 2})
+        self.assertNotContains(response, 'data-next-cursor')
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('activities:list'), {'cursor': 'not-a-cursor'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_fragment_supports_conditional_get(self):
+        self.create_activities(2)
+        url = reverse('activities:list')
+        response = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertNotIn('ETag', self.client.get(url))
+
+        # Only the session, user and validator queries run for an unchanged list
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, {'page': 2}, HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        Activity.objects.first().delete()
+        response = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        activity = Activity.objects.first()
+        activity.name = 'Renamed'
+        activity.save()
+        response = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Renamed')
+
+    def test_sampled_requests_log_a_trace(self):
+        self.create_activities(1)
+        with self.assertNoLogs('lifetracker.trace'):
+            self.client.get(reverse('activities:list'))
+
+        with override_settings(TRACE_SAMPLE_RATE=1), self.assertLogs('lifetracker.trace') as logs:
+            self.client.get(reverse('activities:list'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['events'][0]['event'], 'activities.list')
+        self.assertEqual(len(record['events'][0]['consumed_at']), 1)
+
+    def test_profiling_reports_queries_and_budget_violations(self):
+        self.create_activities(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            log = Path(tmp) / 'profiling.jsonl'
+            budgets = {'activities:list': 1}
+            with override_settings(PROFILING_ENABLED=True, PROFILING_LOG=log, QUERY_BUDGETS=budgets):
+                with self.assertLogs('lifetracker.profiling', 'WARNING'):
+                    response = self.client.get(reverse('activities:list'))
+            entry = json.loads(log.read_text())
+
+        self.assertIn('db;desc=', response['Server-Timing'])
+        self.assertEqual(entry['view'], 'activities:list')
+        self.assertEqual(entry['queries'], self.count_list_queries())
+        self.assertGreater(entry['render_ms'], 0)
+
+
+class CategoryRegistryTestCase(TestCase):
+    """Tests for the in-process category registry."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_hot_paths_do_not_query_categories(self):
+        Activity.objects.create(user=self.user, name='Run', category=self.consume)
+        category_registry.all()
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('activities:list'))
+            self.client.get(reverse('activities:list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            self.client.post(reverse('activities:create'), data={'name': 'Toast', 'category': 'consume'},
+                             content_type='application/json')
+        self.assertFalse([q for q in context.captured_queries if 'activities_activitycategory' in q['sql']])
+
+    def test_changes_are_picked_up(self):
+        self.assertEqual(category_registry.get('consume').color, 'green')
+        self.consume.color = 'red'
+        self.consume.save()
+        self.assertEqual(category_registry.get('consume').color, 'red')
+
+        ActivityCategory.objects.create(name='Sleep', slug='sleep')
+        self.assertEqual([c.slug for c in category_registry.all()], ['consume', 'sleep'])
+
+    def test_other_workers_changes_are_picked_up_after_the_check_interval(self):
+        throttled, unthrottled = CategoryRegistry(), CategoryRegistry(check_interval=0)
+        self.assertEqual(throttled.get('consume').color, 'green')
+        self.assertEqual(unthrottled.get('consume').color, 'green')
+
+        # Another worker changes the category and bumps the version
+        ActivityCategory.objects.filter(pk=self.consume.pk).update(color='red')
+        cache.set(CATEGORY_VERSION_KEY, 'changed elsewhere', None)
+
+        self.assertEqual(throttled.get('consume').color, 'green')
+        self.assertEqual(unthrottled.get('consume').color, 'red')
+
+
+class IngredientTestCase(TestCase):
+    """Tests for normalized consumption ingredients."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+
+    def create_meal(self, name, ingredients):
+        activity = Activity.objects.create(user=self.user, name=name, category=self.consume)
+        consumption = Consumption.objects.create(activity=activity)
+        consumption.set_ingredients(ingredients)
+        return activity, consumption
+
+    def test_set_ingredients_shares_canonical_rows(self):
+        _, first = self.create_meal('Breakfast', ['Eggs', '  toast ', 'eggs'])
+        _, second = self.create_meal('Lunch', ['EGGS', 'Salad'])
+
+        # Each consumption keeps its own spelling of a shared ingredient
+        self.assertEqual(first.ingredient_names, ['Eggs', 'toast'])
+        self.assertEqual(second.ingredient_names, ['EGGS', 'Salad'])
+        self.assertEqual(Ingredient.objects.count(), 3)
+
+    def test_long_ingredient_names_are_truncated(self):
+        _, consumption = self.create_meal('Dinner', ['Soup ' * 50])
+
+        name, = consumption.ingredient_names
+        self.assertEqual(name, ('Soup ' * 40).strip())
+        self.assertEqual(Ingredient.objects.get().key, name.lower())
+
+    def test_containing_ingredient(self):
+        breakfast, _ = self.create_meal('Breakfast', ['Eggs', 'Toast'])
+        self.create_meal('Lunch', ['Salad'])
+
+        self.assertQuerySetEqual(Activity.objects.containing_ingredient('eggs'), [breakfast])
+
+
+class FavoritesTestCase(TestCase):
+    """Tests for favorite deduplication."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def create_favorite(self, **data):
+        payload = {'category': 'consume', 'favorite': True, 'date': '2025-03-01', 'time': '08:00', **data}
+        return self.client.post(reverse('activities:create'), data=payload, content_type='application/json')
+
+    def test_identical_favorite_is_rejected(self):
+        self.assertEqual(self.create_favorite(name='Omelette', ingredients=['Eggs', 'Cheese']).status_code, 200)
+        response = self.create_favorite(name=' omelette', ingredients=['cheese', 'EGGS'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.create_favorite(name='Omelette', ingredients=['Eggs']).status_code, 200)
+
+        response = self.client.get(reverse('activities:get_favorites', args=['consume']))
+        self.assertEqual(len(response.json()), 2)
+
+    def test_favorites_are_cached_until_a_write(self):
+        url = reverse('activities:get_favorites', args=['consume'])
+        self.assertEqual(self.client.get(url).json(), [])
+
+        # Only the session and user lookups remain once the payload is cached
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).json(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_favorite(name='Omelette', description='Fluffy', ingredients=['Eggs', 'Cheese'])
+
+        favorites = self.client.get(url).json()
+        self.assertEqual(len(favorites), 1)
+        self.assertEqual(favorites[0]['description'], 'Fluffy')
+        self.assertEqual(favorites[0]['ingredients'], ['Eggs', 'Cheese'])
+
+    def test_favorites_support_conditional_get(self):
+        url = reverse('activities:get_favorites', args=['consume'])
+        self.create_favorite(name='Omelette', ingredients=['Eggs'])
+        etag = self.client.get(url)['ETag']
+
+        # The validators are cached with the payload, so a 304 costs no activity queries
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_favorite(name='Toast', ingredients=['Bread'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_create_update_and_import_share_the_fingerprint_rule(self):
+        sleep = ActivityCategory.objects.create(name='Sleep', slug='sleep')
+        self.assertEqual(self.create_favorite(category='sleep', name='Nap', description='Short').status_code, 200)
+        created = Activity.objects.get(category=sleep)
+
+        self.client.post(reverse('activities:activity_update', args=[created.pk]), {
+            'name': 'Nap', 'description': 'Short', 'favorite': 'on',
+        })
+        updated = Activity.objects.get(pk=created.pk)
+        self.assertEqual(updated.fingerprint, created.fingerprint)
+
+        body = '{"name": "Nap", "category": "sleep", "description": "Short", "favorite": true}\n'
+        body += '{"name": "Nap", "category": "sleep", "description": "Long", "favorite": true}'
+        summary = self.client.post(reverse('activities:import'), data=body, content_type='application/x-ndjson').json()
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual([error['line'] for error in summary['error_details']], [1])
+
+        imported = Activity.objects.get(category=sleep, description='Long')
+        self.assertEqual(self.create_favorite(category='sleep', name='nap', description='Long').status_code, 400)
+        self.assertEqual(imported.fingerprint, Activity.fingerprint_for(sleep, 'Nap', 'Long'))
+
+    def test_deleting_an_ingredient_invalidates_favorites(self):
+        url = reverse('activities:get_favorites', args=['consume'])
+        self.create_favorite(name='Omelette', ingredients=['Eggs', 'Cheese'])
+        response = self.client.get(url)
+        self.assertEqual(response.json()[0]['ingredients'], ['Eggs', 'Cheese'])
+        activity = Activity.objects.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.get(key='cheese').delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['ingredients'], ['Eggs'])
+        self.assertGreater(Activity.objects.get().updated_at, activity.updated_at)
+
+        # The fingerprint follows the remaining ingredients, so the favorite is still unique
+        self.assertEqual(self.create_favorite(name='Omelette', ingredients=['Eggs']).status_code, 400)
+
+    def test_renaming_an_ingredient_leaves_activities_alone(self):
+        self.create_favorite(name='Omelette', ingredients=['Eggs'])
+        activity = Activity.objects.get()
+
+        ingredient = Ingredient.objects.get(key='eggs')
+        ingredient.name = 'Egg'
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.save()
+        self.assertEqual(Activity.objects.get().updated_at, activity.updated_at)
+
+    def test_batch_create_reports_status_per_item(self):
+        self.create_favorite(name='Omelette', ingredients=['Eggs'])
+        payload = [
+            {'name': 'Toast', 'category': 'consume', 'ingredients': ['Bread', 'Butter']},
+            {'name': 'Omelette', 'category': 'consume', 'favorite': True, 'ingredients': ['Eggs']},
+            {'name': 'Nap', 'category': 'sleep'},
+            'not an object',
+            {'name': 'Coffee', 'category': 'consume', 'favorite': True, 'date': '2025-03-01', 'time': '07:30'},
+            {'name': 'Coffee', 'category': 'consume', 'favorite': True},
+        ]
+        # One duplicate-favorite check and one bulk insert per table, however many items
+        with self.assertNumQueries(16), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('activities:create'), data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(data['errors'], 4)
+        self.assertEqual([result['status'] for result in data['results']],
+                         ['created', 'error', 'error', 'error', 'created', 'error'])
+        self.assertEqual(data['results'][1]['message'], 'An identical favorite activity already exists')
+        self.assertEqual(data['results'][2]['message'], 'Category sleep does not exist')
+
+        toast = Activity.objects.get(pk=data['results'][0]['id'])
+        self.assertEqual(toast.current_consumption.ingredient_names, ['Bread', 'Butter'])
+        favorites = self.client.get(reverse('activities:get_favorites', args=['consume'])).json()
+        self.assertEqual(len(favorites), 2)
+
+    def test_batch_saves_the_rest_when_a_favorite_appears_after_the_check(self):
+        self.create_favorite(name='Omelette', ingredients=['Eggs'])
+
+        class UncheckedImporter(ActivityImporter):
+            # As if the existing favorite was saved by another request after the duplicate check
+            def drop_duplicate_favorites(self, parsed):
+                return parsed
+
+        importer = UncheckedImporter(self.user)
+        rows = [
+            {'name': 'Toast', 'category': 'consume'},
+            {'name': 'Omelette', 'category': 'consume', 'favorite': True, 'ingredients': ['Eggs']},
+            {'name': 'Tea', 'category': 'consume', 'ingredients': ['Tea']},
+        ]
+        created = importer.save_parsed([(index, *importer.parse_row(row)) for index, row in enumerate(rows)])
+
+        self.assertEqual([index for index, _ in created], [0, 2])
+        self.assertEqual(importer.errors, [{'line': 1, 'message': 'An identical favorite activity already exists'}])
+        self.assertEqual(importer.created, 2)
+        self.assertEqual(Activity.objects.get(name='Tea').current_consumption.ingredient_names, ['Tea'])
+
+    def test_batch_size_is_limited(self):
+        payload = [{'name': 'Toast', 'category': 'consume'}] * (views.MAX_BATCH_SIZE + 1)
+        response = self.client.post(reverse('activities:create'), data=payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Activity.objects.exists())
+
+
+class AsyncViewsTestCase(TestCase):
+    """Tests that the async JSON endpoints match their sync versions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+
+    def setUp(self):
+        cache.clear()
+
+    async def call(self, view, request, *args):
+        async def auser():
+            return self.user
+
+        request.user = self.user
+        request.auser = auser
+        return await view(request, *args)
+
+    async def create(self, **data):
+        request = AsyncRequestFactory().post('/activities/create/', data=data, content_type='application/json')
+        return await self.call(async_views.create_activity, request)
+
+    async def test_create_favorite_and_list_it(self):
+        payload = {'name': 'Omelette', 'category': 'consume', 'favorite': True,
+                   'date': '2025-03-01', 'time': '08:00', 'ingredients': ['Eggs', 'Cheese']}
+        self.assertEqual((await self.create(**payload)).status_code, 200)
+        self.assertEqual((await self.create(**payload)).status_code, 400)
+        self.assertEqual((await self.create(name='Nap', category='sleep')).status_code, 400)
+
+        request = AsyncRequestFactory().get('/activities/favorites/consume/')
+        response = await self.call(async_views.get_favorites, request, 'consume')
+        expected = await sync_to_async(views.build_favorites)(self.user, 'consume')
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(expected[0]['ingredients'], ['Eggs', 'Cheese'])
+
+    async def test_activity_detail(self):
+        await self.create(name='Omelette', category='consume', ingredients=['Eggs'])
+        activity = await Activity.objects.afirst()
+
+        request = AsyncRequestFactory().get('/', headers={'X-Requested-With': 'XMLHttpRequest'})
+        response = await self.call(async_views.activity_detail, request, activity.pk)
+        data = json.loads(response.content)
+        self.assertEqual(data['category']['slug'], 'consume')
+        self.assertEqual(data['consumptions'][0]['ingredients'], ['Eggs'])
+
+        with self.assertRaises(Http404):
+            await self.call(async_views.activity_detail, request, activity.pk + 1)
+
+    async def test_activity_detail_supports_conditional_get(self):
+        await self.create(name='Omelette', category='consume', ingredients=['Eggs'])
+        activity = await Activity.objects.afirst()
+
+        request = AsyncRequestFactory().get('/', headers={'X-Requested-With': 'XMLHttpRequest'})
+        etag = (await self.call(async_views.activity_detail, request, activity.pk))['ETag']
+        request = AsyncRequestFactory().get('/', headers={'X-Requested-With': 'XMLHttpRequest', 'If-None-Match': etag})
+        response = await self.call(async_views.activity_detail, request, activity.pk)
+        self.assertEqual(response.status_code, 304)
+
+        await Activity.objects.filter(pk=activity.pk).aupdate(updated_at=F('updated_at') + timedelta(seconds=1))
+        response = await self.call(async_views.activity_detail, request, activity.pk)
+        self.assertEqual(response.status_code, 200)
+
+
+class ImportTestCase(TestCase):
+    """Tests for bulk activity import."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+        cls.exercise = ActivityCategory.objects.create(name='Exercise', slug='exercise', color='blue')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_import_json_lines(self):
+        body = '\n'.join([
+            '{"name": "Omelette", "category": "consume", "date": "2025-03-01", "time": "08:00", "ingredients": ["Eggs", "Cheese"], "favorite": true}',
+            '{"name": "Run", "category": "exercise", "occurred_at": "2025-03-01T18:00:00+00:00"}',
+            '{"name": "Omelette", "category": "consume", "ingredients": ["cheese", "eggs"], "favorite": true}',
+            '{"name": "Nap", "category": "sleep"}',
+            'not json',
+        ])
+        response = self.client.post(reverse('activities:import'), data=body, content_type='application/x-ndjson')
+
+        summary = response.json()
+        self.assertEqual(summary['created'], 2)
+        self.assertEqual(sorted(error['line'] for error in summary['error_details']), [3, 4, 5])
+        omelette = Activity.objects.get(name='Omelette')
+        self.assertEqual(omelette.current_consumption.ingredient_names, ['Eggs', 'Cheese'])
+
+    def test_import_csv(self):
+        body = 'name,category,date,time,ingredients\nToast,consume,2025-03-01,07:30,Bread;Butter\n'
+        response = self.client.post(reverse('activities:import'), data=body, content_type='text/csv')
+
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(Activity.objects.get().current_consumption.ingredient_names, ['Bread', 'Butter'])
+
+    def test_rows_with_wrong_value_types_are_reported(self):
+        rows = [
+            {'name': 5, 'category': 'exercise'},
+            {'name': 'Run', 'category': ['exercise']},
+            {'name': 'Run', 'category': 'exercise', 'occurred_at': 123},
+            {'name': 'Soup', 'category': 'consume', 'ingredients': [1]},
+            {'name': 'Run', 'category': 'exercise', 'description': 7},
+            {'name': 'R' * 201, 'category': 'exercise'},
+            {'name': 'Walk', 'category': 'exercise'},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows)
+        response = self.client.post(reverse('activities:import'), data=body, content_type='application/x-ndjson')
+
+        summary = response.json()
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual([error['line'] for error in summary['error_details']], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(summary['error_details'][0]['message'], 'Name must be a string')
+
+
+class SearchTestCase(TestCase):
+    """Tests for full-text activity search."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.other = User.objects.create_user(email='other@example.com', name='Other', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+        cls.exercise = ActivityCategory.objects.create(name='Exercise', slug='exercise', color='blue')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('activities:search'), {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def names(self, query):
+        return [result['name'] for result in self.search(query)['results']]
+
+    def test_index_follows_every_write_path(self):
+        self.client.post(reverse('activities:create'), content_type='application/json', data={
+            'name': 'Omelette', 'category': 'consume', 'description': 'Fluffy', 'ingredients': ['Eggs', 'Cheese'],
+        })
+        self.client.post(reverse('activities:create'), content_type='application/json', data=[
+            {'name': 'Scrambled eggs', 'category': 'consume', 'ingredients': ['Butter']},
+        ])
+        body = 'name,category,ingredients\nToast,consume,Bread;Butter\n'
+        self.client.post(reverse('activities:import'), data=body, content_type='text/csv')
+        Activity.objects.create(user=self.other, name='Eggs benedict', category=self.consume)
+
+        self.assertEqual(self.names('fluffy'), ['Omelette'])
+        self.assertEqual(self.names('butter'), ['Toast', 'Scrambled eggs'])
+        # Prefix matches, and a name match outranks an ingredient match
+        self.assertEqual(self.names('egg'), ['Scrambled eggs', 'Omelette'])
+        self.assertEqual(self.names('eggs chees'), ['Omelette'])
+
+        omelette = Activity.objects.get(name='Omelette')
+        omelette.current_consumption.set_ingredients(['Tofu'])
+        self.assertEqual(self.names('egg'), ['Scrambled eggs'])
+        Activity.objects.filter(name='Toast').update(name='Sourdough')
+        self.assertEqual(self.names('sourdough'), ['Sourdough'])
+        Activity.objects.filter(name='Sourdough').delete()
+        self.assertEqual(self.names('butter'), ['Scrambled eggs'])
+
+    def test_results_are_paginated(self):
+        for i in range(20):
+            Activity.objects.create(user=self.user, name=f'Run {i}', category=self.exercise)
+
+        first = self.search('run')
+        self.assertEqual(len(first['results']), 15)
+        self.assertEqual(first['next_page'], 2)
+        second = self.search('run', page=2)
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next_page'])
+        self.assertFalse({r['id'] for r in first['results']} & {r['id'] for r in second['results']})
+
+    def test_query_syntax_is_not_interpreted(self):
+        Activity.objects.create(user=self.user, name='Run', category=self.exercise)
+        self.assertEqual(self.names('run" NOT {name}:*'), [])
+        self.assertEqual(self.names('"run*'), ['Run'])
+        self.assertEqual(self.names('*'), [])
+
+
+class ExportTestCase(TestCase):
+    """Tests for streaming activity export."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_export_round_trips_through_import(self):
+        activity = Activity.objects.create(user=self.user, name='Omelette', category=self.consume)
+        consumption = Consumption.objects.create(activity=activity, description='Fluffy')
+        consumption.set_ingredients(['Eggs', 'Cheese'])
+
+        for format, content_type in (('csv', 'text/csv'), ('jsonl', 'application/x-ndjson')):
+            response = self.client.get(reverse('activities:export'), {'format': format})
+            body = b''.join(response.streaming_content)
+
+            other = User.objects.create_user(email=f'{format}@example.com', name='Other', password='password')
+            self.client.force_login(other)
+            summary = self.client.post(reverse('activities:import'), data=body, content_type=content_type).json()
+            self.assertEqual(summary['created'], 1)
+            imported = Activity.objects.get(user=other)
+            self.assertEqual(imported.current_consumption.description, 'Fluffy')
+            self.assertEqual(imported.current_consumption.ingredient_names, ['Eggs', 'Cheese'])
+            self.client.force_login(self.user)
+
+    def test_gzip_export(self):
+        Activity.objects.create(user=self.user, name='Omelette', category=self.consume)
+        response = self.client.get(reverse('activities:export'), {'format': 'ndjson', 'gzip': '1'})
+        rows = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(json.loads(rows[0])['name'], 'Omelette')
+
+
+class BenchmarkTestCase(TestCase):
+    """Smoke test for the synthetic data generator and benchmark runner."""
+
+    def test_seed_and_run(self):
+        from benchmarks.activities import run
+        from benchmarks.data import seed
+
+        user, = seed(users=1, activities=40)
+        self.assertEqual(user.activities.count(), Activity.objects.count())
+        self.assertEqual(user.activities.exclude(created_at=F('occurred_at')).count(), 0)
+
+        results = run(user, iterations=2, warmup=0, host='testserver')
+        self.assertEqual(set(results['cases']), {
+            'list', 'list_date_filter', 'list_deep_page', 'list_ajax',
+            'get_favorites', 'activity_detail', 'search', 'create_activity',
+        })
+        self.assertGreater(results['cases']['list']['queries'], 0)
+
+    def test_search_benchmark(self):
+        from benchmarks.data import seed
+        from benchmarks.search import run
+
+        user, = seed(users=1, activities=40)
+        results = run(user, queries=['eggs'], iterations=2, warmup=0)
+        self.assertEqual(set(results['cases']['eggs']), {'fts', 'icontains'})
+        self.assertEqual(results['cases']['eggs']['fts']['results'], results['cases']['eggs']['icontains']['results'])
+
+    def test_compression_benchmark(self):
+        from benchmarks.compression import run
+        from benchmarks.data import seed
+
+        user, = seed(users=1, activities=20)
+        results = run(user, iterations=1, host='testserver')
+        page = results['pages']['activities_fragment']
+        self.assertEqual(page['cards'], 15)
+        self.assertLess(page['minify']['bytes'], page['bytes'])
+        self.assertLess(page['minify_gzip']['bytes'], page['gzip']['bytes'])
+
+    def test_template_benchmark(self):
+        from benchmarks.data import seed
+        from benchmarks.templates import TEMPLATES, run
+
+        user, = seed(users=1, activities=20)
+        results = run(user, profiles=['production', 'uncached'], iterations=2, host='testserver')
+        self.assertEqual(set(results['profiles']['production']), {*TEMPLATES, 'warm_up'})
+        self.assertEqual(results['profiles']['uncached']['warm_up']['templates'], 0)
+
+    def test_session_benchmark(self):
+        from benchmarks.data import seed
+        from benchmarks.sessions import run
+
+        user, = seed(users=1, activities=10)
+        results = run(user, iterations=1, warmup=1, host='testserver')
+        self.assertEqual(results['profiles']['db']['dashboard']['session_queries'], 1)
+        self.assertEqual(results['profiles']['cached_db']['dashboard']['session_queries'], 0)
+        self.assertEqual(results['profiles']['signed_cookies']['dashboard']['user_queries'], 0)
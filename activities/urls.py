@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'activities'
 
+# Under ASGI the JSON endpoints are served by native async views
+json_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     path('', views.activities_view, name='list'),
     path('', views.activities_view, name='activities'),
-    path('create/', views.create_activity, name='create'),
-    path('<int:pk>/', views.activity_detail, name='activity_detail'),
+    path('create/', json_views.create_activity, name='create'),
+    path('import/', views.import_activities, name='import'),
+    path('export/', views.export_activities, name='export'),
+    path('search/', views.search_activities, name='search'),
+    path('<int:pk>/', json_views.activity_detail, name='activity_detail'),
     path('<int:pk>/update/', views.update_activity, name='activity_update'),
     path('<int:pk>/delete/', views.delete_activity, name='delete'),
-    path('favorites/<str:category_slug>/', views.get_favorites, name='get_favorites'),
+    path('favorites/<str:category_slug>/', json_views.get_favorites, name='get_favorites'),
 ] 
\ No newline at end of file
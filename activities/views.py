@@ -1,24 +1,37 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.urls import reverse
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from datetime import datetime, timedelta
+import codecs
 import json
-from .models import Activity, ActivityCategory, Consumption
-from django.db import models
-from zoneinfo import ZoneInfo
+from core.instrumentation import trace, tracing
+from core.timezones import UTC, day_range, get_zone
+from dashboard.rollups import move_activity, record_activity
+from .cache import FAVORITES_CACHE_TIMEOUT, favorites_cache_key
+from .categories import category_registry
+from .conditional import condition_on_activities, detail_scope, favorites_scope, favorites_state, list_scope
+from .exporter import CONTENT_TYPES as EXPORT_CONTENT_TYPES, FORMATS as EXPORT_FORMATS, iter_export
+from .importer import ActivityImporter, read_rows
+from .models import Activity, Consumption
+from .pagination import InvalidCursor, encode_cursor, paginate_by_cursor
+from .search import search
 
 @login_required
+@condition_on_activities(list_scope)
 def activities_view(request):
     """View for activities page."""
-    # Get all categories for the filter
-    categories = ActivityCategory.objects.all()
+    # Get all categories for the filter from the in-process registry
+    categories = category_registry.all()
     
     # Get all activities for the current user
-    activities_queryset = Activity.objects.filter(user=request.user)
+    activities_queryset = Activity.objects.filter(user=request.user).for_list()
     
     # Handle date filtering
     date_str = request.GET.get('date')
@@ -27,222 +40,291 @@ def activities_view(request):
             # Convert the date string to a datetime object in the user's timezone
             naive_date = datetime.strptime(date_str, '%Y-%m-%d')
             
-            # Get the user's timezone
-            user_timezone = request.user.timezone
+            # Start and end of the day in the user's local timezone (cached per timezone and date)
+            start_date, end_date = day_range(request.user.timezone, naive_date.date())
             
-            # Create timezone-aware datetime objects for start and end of the day
-            # Make sure to use the user's local timezone for the day boundaries
-            start_date = timezone.make_aware(
-                datetime.combine(naive_date.date(), datetime.min.time()),
-                ZoneInfo(user_timezone)
+            # Filter on the denormalized occurred_at (consumed_at for consumptions),
+            # which the (user, occurred_at) index serves as a single range scan
+            activities_queryset = activities_queryset.filter(
+                occurred_at__range=(start_date, end_date)
             )
             
-            end_date = timezone.make_aware(
-                datetime.combine(naive_date.date(), datetime.max.time()),
-                ZoneInfo(user_timezone)
-            )
-            
-            # Filter activities based on either created_at or consumed_at
-            activities_queryset = Activity.objects.filter(
-                models.Q(
-                    user=request.user,
-                    created_at__range=(start_date, end_date)
-                ) |
-                models.Q(
-                    user=request.user,
-                    category__slug='consume',
-                    consumptions__consumed_at__range=(start_date, end_date)
-                )
-            ).distinct().order_by('-created_at')
-            
         except ValueError:
             # If date parsing fails, return all activities
             pass
     
-    # Implement pagination - 15 items per page
-    paginator = Paginator(activities_queryset, 15)
-    page = request.GET.get('page')
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    next_cursor = None
+    page_numbers = None
     
-    try:
-        activities = paginator.page(page)
-    except PageNotAnInteger:
-        # If page is not an integer, deliver first page
-        activities = paginator.page(1)
-    except EmptyPage:
-        # If page is out of range, deliver last page
-        activities = paginator.page(paginator.num_pages)
-    
-    # Add raw datetime values for debugging
-    debug_info = {}
-    for activity in activities:
-        if activity.category.slug == 'consume':
-            consumption = activity.consumptions.first()
-            if consumption:
-                debug_info[activity.id] = {
-                    'raw_datetime': consumption.consumed_at.isoformat(),
-                    'in_utc': consumption.consumed_at.astimezone(ZoneInfo('UTC')).isoformat(),
-                    'in_toronto': consumption.consumed_at.astimezone(ZoneInfo('America/Toronto')).isoformat(),
-                }
+    if is_ajax and 'cursor' in request.GET:
+        # Keyset pagination for infinite scroll - no COUNT or OFFSET, so deep pages cost the same
+        try:
+            activities, next_cursor = paginate_by_cursor(activities_queryset, request.GET.get('cursor'), 15)
+        except InvalidCursor:
+            return JsonResponse({'message': 'Invalid cursor'}, status=400)
+    else:
+        # Implement pagination - 15 items per page
+        # Same order as the cursor, so infinite scroll can continue from the end of any page
+        paginator = Paginator(activities_queryset.order_by('-created_at', '-id'), 15)
+        page = request.GET.get('page')
+        
+        try:
+            activities = paginator.page(page)
+        except PageNotAnInteger:
+            # If page is not an integer, deliver first page
+            activities = paginator.page(1)
+        except EmptyPage:
+            # If page is out of range, deliver last page
+            activities = paginator.page(paginator.num_pages)
+        
+        if activities.has_next():
+            next_cursor = encode_cursor(activities[len(activities) - 1])
+        
+        # Only the two pages either side of the current one are linked; looping over
+        # paginator.page_range in the template costs a pass per page of history
+        page_numbers = range(max(1, activities.number - 2), min(paginator.num_pages, activities.number + 2) + 1)
+    
+    if tracing():
+        # Timezone diagnostics are only computed for sampled requests
+        trace('activities.list', timezone=request.user.timezone, date=date_str, cursor=next_cursor,
+              consumed_at=[
+                  activity.current_consumption.consumed_at
+                  for activity in activities if activity.current_consumption
+              ])
     
     context = {
         'activities': activities,
         'categories': categories,
         'user_timezone': request.user.timezone,
-        'debug_info': debug_info,
+        'category_version': category_registry.version,
+        'next_cursor': next_cursor,
+        'page_numbers': page_numbers,
     }
     
     # If it's an AJAX request, return only the activities list
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return render(request, 'activities/partials/activities_list.html', context)
+    if is_ajax:
+        response = render(request, 'activities/partials/activities_list.html', context)
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        return response
     
     return render(request, 'activities/activities.html', context)
 
 @login_required
+@condition_on_activities(detail_scope)
 def activity_detail(request, pk):
     """View for a single activity."""
-    activity = get_object_or_404(Activity, pk=pk, user=request.user)
+    activity = get_object_or_404(Activity.objects.for_list(), pk=pk, user=request.user)
     
     # Return JSON for AJAX requests
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        activity_data = {
-            'id': activity.id,
-            'name': activity.name,
-            'description': activity.description,
-            'favorite': activity.favorite,
-            'category': {
-                'name': activity.category.name,
-                'slug': activity.category.slug,
-                'color': activity.category.color
-            }
-        }
-        
-        # Add consumption details if applicable
-        if activity.category.slug == 'consume':
-            consumption = activity.consumptions.first()
-            if consumption:
-                activity_data['consumptions'] = [{
-                    'description': consumption.description,
-                    'ingredients': consumption.ingredients.split('\n') if consumption.ingredients else [],
-                    'consumed_at': consumption.consumed_at.isoformat() if consumption.consumed_at else None
-                }]
-        
-        return JsonResponse(activity_data)
+        return JsonResponse(activity_detail_data(activity))
     
     # Return HTML for regular requests
     return render(request, 'activities/activity_detail.html', {'activity': activity})
 
-@require_POST
-def create_activity(request):
-    try:
-        # Get request data
-        data = json.loads(request.body)
-        name = data.get('name')
-        category_slug = data.get('category')
-        is_favorite = data.get('favorite', False)
-        
-        # Basic validation
-        if not name or not category_slug:
-            return JsonResponse({'message': 'Name and category are required'}, status=400)
+def activity_detail_data(activity):
+    """Serialize an activity fetched with for_list() for the detail modal."""
+    activity_data = {
+        'id': activity.id,
+        'name': activity.name,
+        'description': activity.description,
+        'favorite': activity.favorite,
+        'category': {
+            'name': activity.category.name,
+            'slug': activity.category.slug,
+            'color': activity.category.color
+        }
+    }
+    
+    # Add consumption details if applicable
+    if activity.category.slug == 'consume':
+        consumption = activity.current_consumption
+        if consumption:
+            activity_data['consumptions'] = [{
+                'description': consumption.description,
+                'ingredients': consumption.ingredient_names,
+                'consumed_at': consumption.consumed_at.isoformat() if consumption.consumed_at else None
+            }]
+    
+    return activity_data
+
+class ActivityPayloadError(ValueError):
+    """Raised when an activity create payload fails validation"""
+
+def parse_activity_payload(data, user, category):
+    """Validate a create payload for its resolved category and return the fields to save."""
+    name = data.get('name')
+    category_slug = data.get('category')
+    
+    # Basic validation
+    if not name or not category_slug:
+        raise ActivityPayloadError('Name and category are required')
+    if category is None:
+        raise ActivityPayloadError(f'Category {category_slug} does not exist')
+    
+    fields = {
+        'name': name,
+        'category': category,
+        'favorite': data.get('favorite', False),
+        # Consume activities keep their description on the consumption
+        'description': None,
+        # Non-consumption activities occur when they are logged
+        'occurred_at': timezone.now(),
+        'consumption': None,
+    }
+    
+    # Handle category-specific data
+    if category_slug == 'consume':
+        # Get consumption-specific data
+        description = data.get('description', '')
+        ingredients = data.get('ingredients', [])
+        date_str = data.get('date')
+        time_str = data.get('time')
         
-        # Get the category
-        try:
-            category = ActivityCategory.objects.get(slug=category_slug)
-        except ActivityCategory.DoesNotExist:
-            return JsonResponse({'message': f'Category {category_slug} does not exist'}, status=400)
-            
-        # For favorites, check if a similar favorite already exists
-        if is_favorite:
-            # Check if this user already has a favorite with this name in this category
-            existing_favorite = Activity.objects.filter(
-                user=request.user,
-                name__iexact=name,
-                category=category,
-                favorite=True
-            ).first()
-            
-            # For consumption activities, also check description and ingredients
-            if existing_favorite and category_slug == 'consume':
-                description = data.get('description', '').strip()
-                ingredients = [i.strip() for i in data.get('ingredients', []) if i.strip()]
+        # Parse date and time
+        if date_str and time_str:
+            try:
+                # Combine date and time strings
+                datetime_str = f"{date_str} {time_str}"
                 
-                # Get existing consumption details
-                existing_consumption = Consumption.objects.filter(activity=existing_favorite).first()
+                # Parse the datetime as a naive datetime
+                naive_dt = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M')
                 
-                if existing_consumption:
-                    existing_description = (existing_consumption.description or '').strip()
-                    existing_ingredients = [i.strip() for i in (existing_consumption.ingredients or '').split('\n') if i.strip()]
-                    
-                    # Only consider it a duplicate if name, description, and ingredients match
-                    # If either the new or existing activity has no description/ingredients, don't consider them in duplicate check
-                    description_match = (not description and not existing_description) or description == existing_description
-                    ingredients_match = (not ingredients and not existing_ingredients) or set(ingredients) == set(existing_ingredients)
-                    
-                    if not (description_match and ingredients_match):
-                        # If details differ, it's not a true duplicate
-                        existing_favorite = None
-            
-            if existing_favorite:
-                return JsonResponse({'message': 'An identical favorite activity already exists'}, status=400)
+                # Get the user's timezone
+                user_timezone = user.timezone
+                
+                # Make it timezone-aware using the user's timezone
+                # This correctly localizes the time
+                aware_dt = timezone.make_aware(naive_dt, get_zone(user_timezone))
+                
+                # Convert to UTC for storage in the database
+                # This ensures consistent timezone storage
+                utc_dt = aware_dt.astimezone(UTC)
+                
+                trace('activity.create.localize', input=datetime_str, timezone=user_timezone,
+                      local=aware_dt, utc=utc_dt)
+                
+            except ValueError:
+                raise ActivityPayloadError('Invalid date or time format')
+        else:
+            # Default to current time in user's timezone
+            aware_dt = timezone.now()
+            utc_dt = aware_dt.astimezone(UTC)
         
-        # Create the activity
+        fields['occurred_at'] = utc_dt
+        fields['consumption'] = {'description': description, 'ingredients': ingredients}
+        fields['fingerprint'] = Activity.fingerprint_for(category, name, description, ingredients)
+    else:
+        fields['description'] = data.get('description', '')
+        fields['fingerprint'] = Activity.fingerprint_for(category, name, fields['description'])
+    
+    return fields
+
+def save_new_activity(user, fields):
+    """Create an activity from parsed payload fields in one transaction and record it in the rollups."""
+    with transaction.atomic():
+        # Create the activity, denormalizing when it occurred for the day filter.
+        # Duplicate favorites are rejected by the unique fingerprint constraint.
         activity = Activity.objects.create(
-            user=request.user,
-            name=name,
-            category=category,
-            favorite=is_favorite
+            user=user,
+            name=fields['name'],
+            category=fields['category'],
+            description=fields['description'],
+            favorite=fields['favorite'],
+            occurred_at=fields['occurred_at'],
+            fingerprint=fields['fingerprint']
         )
         
-        # Handle category-specific data
-        if category_slug == 'consume':
-            # Get consumption-specific data
-            description = data.get('description', '')
-            ingredients = data.get('ingredients', [])
-            date_str = data.get('date')
-            time_str = data.get('time')
-            
-            # Join ingredients as newline-separated string
-            ingredients_str = '\n'.join(ingredients) if ingredients else ''
-            
-            # Parse date and time
-            if date_str and time_str:
-                try:
-                    # Combine date and time strings
-                    datetime_str = f"{date_str} {time_str}"
-                    
-                    # Parse the datetime as a naive datetime
-                    naive_dt = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M')
-                    
-                    # Get the user's timezone
-                    user_timezone = request.user.timezone
-                    
-                    # Make it timezone-aware using the user's timezone
-                    # This correctly localizes the time
-                    aware_dt = timezone.make_aware(naive_dt, ZoneInfo(user_timezone))
-                    
-                    # Convert to UTC for storage in the database
-                    # This ensures consistent timezone storage
-                    utc_dt = aware_dt.astimezone(ZoneInfo('UTC'))
-                    
-                    print(f"Input date/time: {date_str} {time_str}")
-                    print(f"User timezone: {user_timezone}")
-                    print(f"Naive datetime: {naive_dt}")
-                    print(f"Aware datetime (user TZ): {aware_dt}")
-                    print(f"UTC datetime: {utc_dt}")
-                    
-                except ValueError:
-                    return JsonResponse({'message': 'Invalid date or time format'}, status=400)
-            else:
-                # Default to current time in user's timezone
-                aware_dt = timezone.now()
-                utc_dt = aware_dt.astimezone(ZoneInfo('UTC'))
-            
+        consumption = fields['consumption']
+        if consumption is not None:
             # Create consumption record with the timezone-aware datetime
             Consumption.objects.create(
                 activity=activity,
-                description=description,
-                ingredients=ingredients_str,
-                consumed_at=utc_dt  # Store as UTC
-            )
+                description=consumption['description'],
+                consumed_at=fields['occurred_at']  # Store as UTC
+            ).set_ingredients(consumption['ingredients'])
+        
+        record_activity(user, fields['category'].id, fields['occurred_at'])
+    return activity
+
+# Largest array create_activity accepts in one request
+MAX_BATCH_SIZE = 100
+
+def create_activities_batch(user, items):
+    """
+    Create a list of activity payloads in one transaction and report a status per item.
+    
+    Categories are resolved once per distinct slug, duplicate favorites are found with
+    a single query and reported as failed items, and everything else is written with
+    bulk inserts by the importer.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise ActivityPayloadError(f'A batch may contain at most {MAX_BATCH_SIZE} activities')
+    
+    importer = ActivityImporter(user)
+    categories = {}
+    parsed = []
+    for index, data in enumerate(items):
+        if not isinstance(data, dict):
+            importer.add_error(index, 'Expected a JSON object')
+            continue
+        slug = data.get('category')
+        if slug not in categories:
+            categories[slug] = category_registry.get(slug)
+        try:
+            fields = parse_activity_payload(data, user, categories[slug])
+        except ActivityPayloadError as e:
+            importer.add_error(index, str(e))
+            continue
+        
+        activity = Activity(
+            user=user,
+            name=fields['name'],
+            category=fields['category'],
+            description=fields['description'],
+            favorite=fields['favorite'],
+            occurred_at=fields['occurred_at'],
+            fingerprint=fields['fingerprint'],
+        )
+        consumption = fields['consumption'] or {'description': '', 'ingredients': []}
+        parsed.append((index, activity, consumption['description'], consumption['ingredients']))
+    
+    with transaction.atomic():
+        created = importer.save_parsed(parsed)
+        transaction.on_commit(importer.invalidate_caches)
+    
+    results = [{'index': index, 'status': 'created', 'id': activity.id} for index, activity in created]
+    results.extend(
+        {'index': error['line'], 'status': 'error', 'message': error['message']}
+        for error in importer.errors
+    )
+    results.sort(key=lambda result: result['index'])
+    return {
+        'message': f'Created {importer.created} of {len(items)} activities',
+        'created': importer.created,
+        'errors': importer.error_count,
+        'results': results,
+    }
+
+@require_POST
+def create_activity(request):
+    try:
+        # Get request data
+        data = json.loads(request.body)
+        
+        # An array of payloads is created as one batch
+        if isinstance(data, list):
+            return JsonResponse(create_activities_batch(request.user, data))
+        
+        category = category_registry.get(data.get('category'))
+        fields = parse_activity_payload(data, request.user, category)
+        
+        try:
+            save_new_activity(request.user, fields)
+        except IntegrityError:
+            return JsonResponse({'message': 'An identical favorite activity already exists'}, status=400)
         
         return JsonResponse({'message': 'Activity created successfully'})
     
@@ -251,14 +333,78 @@ def create_activity(request):
     except Exception as e:
         return JsonResponse({'message': str(e)}, status=400)
 
+# Request content types accepted by the import endpoint
+IMPORT_CONTENT_TYPES = {
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'text/csv': 'csv',
+}
+
+@login_required
+def search_activities(request):
+    """Ranked full-text search over the user's activities, ingredients included."""
+    query = request.GET.get('q', '')
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    
+    activities, has_next = search(request.user, query, page)
+    results = []
+    for activity in activities:
+        result = activity_detail_data(activity)
+        result['occurred_at'] = activity.occurred_at.isoformat()
+        result['url'] = activity.get_absolute_url()
+        results.append(result)
+    
+    return JsonResponse({
+        'query': query,
+        'page': page,
+        'next_page': page + 1 if has_next else None,
+        'results': results,
+    })
+
+@login_required
+@require_POST
+def import_activities(request):
+    """Bulk import activities from a JSON Lines or CSV request body."""
+    format = IMPORT_CONTENT_TYPES.get(request.content_type)
+    if format is None:
+        return JsonResponse({'message': f'Unsupported content type {request.content_type}'}, status=415)
+    
+    # Stream the body line by line instead of loading it into memory
+    lines = codecs.getreader(request.encoding or 'utf-8')(request)
+    summary = ActivityImporter(request.user).run(read_rows(lines, format))
+    
+    return JsonResponse(summary)
+
+@login_required
+def export_activities(request):
+    """Stream the user's full history as CSV or JSON Lines, optionally gzipped."""
+    format = request.GET.get('format', 'csv')
+    format = 'jsonl' if format == 'ndjson' else format
+    if format not in EXPORT_FORMATS:
+        return JsonResponse({'message': f'Unsupported export format {format}'}, status=400)
+    compress = request.GET.get('gzip') in ('1', 'true')
+    
+    filename = f'activities.{format}' + ('.gz' if compress else '')
+    response = StreamingHttpResponse(
+        iter_export(request.user, format, compress=compress),
+        content_type='application/gzip' if compress else EXPORT_CONTENT_TYPES[format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 @login_required
 def delete_activity(request, pk):
     """Delete an activity."""
-    activity = get_object_or_404(Activity, pk=pk, user=request.user)
+    activity = get_object_or_404(Activity.objects.with_categories(), pk=pk, user=request.user)
     
     if request.method == 'POST':
         activity_name = activity.name
-        activity.delete()
+        with transaction.atomic():
+            record_activity(request.user, activity.category_id, activity.occurred_at, -1)
+            activity.delete()
         
         # Check if it's an AJAX request
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -274,56 +420,79 @@ def delete_activity(request, pk):
     return render(request, 'activities/delete_activity.html', {'activity': activity})
 
 @login_required
+@condition_on_activities(favorites_scope, favorites_state)
 def get_favorites(request, category_slug):
     """Get favorite activities for a specific category."""
+    # Serve the serialized payload from cache; signals invalidate it on every write
+    cache_key = favorites_cache_key(request.user.id, category_slug)
+    content = cache.get(cache_key)
+    if content is None:
+        content = json.dumps(build_favorites(request.user, category_slug), cls=DjangoJSONEncoder)
+        cache.set(cache_key, content, FAVORITES_CACHE_TIMEOUT)
+    
+    return HttpResponse(content, content_type='application/json')
+
+def build_favorites(user, category_slug):
+    """Build the favorites payload for a category in a single query."""
+    category = category_registry.get(category_slug)
+    if category is None:
+        return []
+    
+    rows = favorites_query(user, category)
+    
+    # For other categories, just get basic info
+    if category.slug != 'consume':
+        return list(rows)
+    return fold_favorite_rows(rows)
+
+def favorites_query(user, category):
+    """Return the rows behind a user's favorites in a category."""
     # Get base favorites query
     favorites_query = Activity.objects.filter(
-        user=request.user,
-        category__slug=category_slug,
+        user=user,
+        category=category,
         favorite=True
     )
     
-    # For consume category, include consumption details
-    if category_slug == 'consume':
-        favorites = []
-        for activity in favorites_query:
-            consumption = Consumption.objects.filter(activity=activity).first()
-            favorite_data = {
-                'id': activity.id,
-                'name': activity.name,
-                'description': consumption.description if consumption else None,
-                'ingredients': consumption.ingredients.split('\n') if consumption and consumption.ingredients else []
+    # For other categories, just get basic info
+    if category.slug != 'consume':
+        return favorites_query.values('id', 'name', 'description')
+    
+    # For consume category, join consumption details and ingredients into one row set,
+    # newest consumption first so the first consumption seen per activity is the current one
+    return favorites_query.order_by(
+        '-created_at', 'id', '-consumptions__consumed_at', 'consumptions__id',
+        'consumptions__consumption_ingredients__position'
+    ).values_list(
+        'id', 'name', 'consumptions__id', 'consumptions__description',
+        'consumptions__consumption_ingredients__name'
+    )
+
+def fold_favorite_rows(rows):
+    """Fold joined consume favorite rows into one entry per activity with its current ingredients."""
+    favorites = {}
+    current_consumption = {}
+    for activity_id, name, consumption_id, description, ingredient in rows:
+        if activity_id not in favorites:
+            favorites[activity_id] = {
+                'id': activity_id,
+                'name': name,
+                'description': description,
+                'ingredients': []
             }
-            favorites.append(favorite_data)
-    else:
-        # For other categories, just get basic info
-        favorites = list(favorites_query.values('id', 'name', 'description'))
-    
-    # Remove duplicates based on name and description
-    unique_favorites = []
-    seen = set()
-    for favorite in favorites:
-        # For consume items, include ingredients in the uniqueness check
-        if category_slug == 'consume':
-            key = (
-                favorite['name'].lower(),
-                (favorite.get('description') or '').strip(),
-                tuple(sorted(favorite.get('ingredients', [])))
-            )
-        else:
-            key = (favorite['name'].lower(), (favorite.get('description') or '').strip())
-            
-        if key not in seen:
-            seen.add(key)
-            unique_favorites.append(favorite)
+            current_consumption[activity_id] = consumption_id
+        if ingredient is not None and consumption_id == current_consumption[activity_id]:
+            favorites[activity_id]['ingredients'].append(ingredient)
     
-    return JsonResponse(unique_favorites, safe=False)
+    # Favorites are unique per fingerprint in the database, so no deduplication is needed
+    return list(favorites.values())
 
 @login_required
 @require_POST
 def update_activity(request, pk):
     """Update an activity."""
-    activity = get_object_or_404(Activity, pk=pk, user=request.user)
+    activity = get_object_or_404(Activity.objects.with_categories(), pk=pk, user=request.user)
+    old_occurred_at = activity.occurred_at
     
     try:
         # Validate required fields
@@ -338,7 +507,7 @@ def update_activity(request, pk):
         activity.name = name
         activity.description = request.POST.get('description', '')
         activity.favorite = request.POST.get('favorite') == 'on'
-        activity.save()
+        consumption = None
         
         # Handle consumption-specific fields
         if activity.category.slug == 'consume':
@@ -347,7 +516,6 @@ def update_activity(request, pk):
                 consumption = Consumption(activity=activity)
             
             consumption.description = request.POST.get('consumption_description', '')
-            consumption.ingredients = request.POST.get('ingredients', '')
             
             # Combine date and time for consumed_at
             consumed_date = request.POST.get('consumed_at_date')
@@ -361,19 +529,16 @@ def update_activity(request, pk):
                     user_timezone = request.user.timezone
                     
                     # Make it timezone-aware using the user's timezone
-                    aware_dt = timezone.make_aware(naive_dt, ZoneInfo(user_timezone))
+                    aware_dt = timezone.make_aware(naive_dt, get_zone(user_timezone))
                     
                     # Convert to UTC for storage in the database
-                    utc_dt = aware_dt.astimezone(ZoneInfo('UTC'))
+                    utc_dt = aware_dt.astimezone(UTC)
                     
                     # Store the UTC time in the database
                     consumption.consumed_at = utc_dt
                     
-                    print(f"Update - Input date/time: {consumed_date} {consumed_time}")
-                    print(f"Update - User timezone: {user_timezone}")
-                    print(f"Update - Naive datetime: {naive_dt}")
-                    print(f"Update - Aware datetime (user TZ): {aware_dt}")
-                    print(f"Update - UTC datetime: {utc_dt}")
+                    trace('activity.update.localize', input=f"{consumed_date} {consumed_time}",
+                          timezone=user_timezone, local=aware_dt, utc=utc_dt)
                     
                 except ValueError as e:
                     return JsonResponse({
@@ -381,13 +546,30 @@ def update_activity(request, pk):
                         'error': f'Invalid date/time format: {str(e)}'
                     }, status=400)
             
-            consumption.save()
+            # Keep the denormalized timestamp and fingerprint in sync with the consumption
+            ingredients = request.POST.get('ingredients', '').splitlines()
+            activity.occurred_at = consumption.consumed_at
+            activity.fingerprint = Activity.fingerprint_for(activity.category, name, consumption.description, ingredients)
+        else:
+            activity.fingerprint = Activity.fingerprint_for(activity.category, name, activity.description)
+        
+        with transaction.atomic():
+            activity.save()
+            if consumption is not None:
+                consumption.save()
+                consumption.set_ingredients(ingredients)
+            move_activity(request.user, activity.category_id, old_occurred_at, activity.occurred_at)
         
         return JsonResponse({
             'success': True,
             'message': 'Activity updated successfully'
         })
         
+    except IntegrityError:
+        return JsonResponse({
+            'success': False,
+            'error': 'An identical favorite activity already exists'
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
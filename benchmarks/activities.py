@@ -0,0 +1,123 @@
+"""
+Request benchmarks for the activities views.
+
+Each case drives a view through the Django test client as a seeded user and
+records per-request latency and query counts. run() returns a JSON-friendly
+dict so results from different commits can be diffed.
+"""
+import platform
+import statistics
+import subprocess
+import time
+from itertools import count
+
+import django
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from activities.models import Activity
+from core.profiling import percentile
+from core.timezones import local_date
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def build_cases(user):
+    """Return (name, callable(client)) pairs for every benchmarked request"""
+    activities = Activity.objects.filter(user=user)
+    latest = activities.order_by('-occurred_at').first()
+    if latest is None:
+        raise ValueError(f'{user.email} has no activities; run manage.py seed_benchmark first')
+    busy_day = local_date(latest.occurred_at, user.timezone).isoformat()
+    last_page = max(1, -(-activities.count() // 15))
+    list_url = reverse('activities:list')
+    detail_url = reverse('activities:activity_detail', args=[latest.pk])
+    favorites_url = reverse('activities:get_favorites', args=['consume'])
+    create_url = reverse('activities:create')
+    search_url = reverse('activities:search')
+    serial = count()
+
+    def create(client):
+        return client.post(create_url, content_type='application/json', data={
+            'name': f'Benchmark meal {next(serial)}',
+            'category': 'consume',
+            'description': 'Benchmark',
+            'ingredients': ['Rice', 'Beans'],
+            'date': busy_day,
+            'time': '12:00',
+        })
+
+    return [
+        ('list', lambda client: client.get(list_url)),
+        ('list_date_filter', lambda client: client.get(list_url, {'date': busy_day})),
+        ('list_deep_page', lambda client: client.get(list_url, {'page': last_page})),
+        ('list_ajax', lambda client: client.get(list_url, **AJAX)),
+        ('get_favorites', lambda client: client.get(favorites_url)),
+        ('activity_detail', lambda client: client.get(detail_url, **AJAX)),
+        ('search', lambda client: client.get(search_url, {'q': 'eggs'})),
+        ('create_activity', create),
+    ]
+
+
+def measure(client, request, iterations, warmup):
+    """Time a request repeatedly and summarize latency and query counts"""
+    for _ in range(warmup):
+        request(client)
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request(client)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'Request failed with status {response.status_code}')
+        queries.append(len(context.captured_queries))
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'min_ms': round(timings[0], 3),
+        'queries': max(queries),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(user, iterations=50, warmup=5, only=None, host='localhost'):
+    """Benchmark every case (or the named ones) as the given user"""
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+    cases = {}
+    for name, request in build_cases(user):
+        if only and name not in only:
+            continue
+        try:
+            cases[name] = measure(client, request, iterations, warmup)
+        except RuntimeError as e:
+            raise RuntimeError(f'{name}: {e}')
+
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'user': user.email,
+        'activities': Activity.objects.filter(user=user).count(),
+        'cases': cases,
+    }
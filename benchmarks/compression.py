@@ -0,0 +1,96 @@
+"""
+Response size and CPU cost of HTML minification and compression.
+
+Each page is rendered once through the test client as a seeded user with
+the compression middleware switched off, so the raw bytes are what the
+templates produce. Every pipeline (minify, gzip, brotli and their
+combinations) is then applied to those bytes repeatedly and timed with
+process CPU time, which is what the middleware adds to each response.
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core import compression
+from core.profiling import percentile
+
+from .activities import AJAX, git_revision
+
+
+def build_pages(user):
+    """Return (name, callable(client)) pairs for the measured pages; each list page shows 15 cards"""
+    if not user.activities.exists():
+        raise ValueError(f'{user.email} has no activities; run manage.py seed_benchmark first')
+    list_url = reverse('activities:list')
+    return [
+        ('activities', lambda client: client.get(list_url)),
+        ('activities_fragment', lambda client: client.get(list_url, **AJAX)),
+        ('dashboard', lambda client: client.get(reverse('dashboard'))),
+    ]
+
+
+def pipelines(charset):
+    def minify(body):
+        return compression.minify_html(body.decode(charset)).encode(charset)
+
+    available = {
+        'minify': minify,
+        'gzip': lambda body: compression.compress(body, 'gzip'),
+        'minify_gzip': lambda body: compression.compress(minify(body), 'gzip'),
+    }
+    if compression.brotli is not None:
+        available['br'] = lambda body: compression.compress(body, 'br')
+        available['minify_br'] = lambda body: compression.compress(minify(body), 'br')
+    return available
+
+
+def measure(function, body, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.process_time()
+        output = function(body)
+        timings.append((time.process_time() - started) * 1000)
+
+    timings.sort()
+    return {
+        'bytes': len(output),
+        'ratio': round(len(output) / len(body), 3),
+        'cpu_p50_ms': round(percentile(timings, 0.5), 3),
+        'cpu_mean_ms': round(statistics.fmean(timings), 3),
+    }
+
+
+def run(user, iterations=50, host='localhost'):
+    """Render each page as the given user and measure every compression pipeline on it"""
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+
+    # The list pages show their first 15 activities
+    cards = min(15, user.activities.count())
+    pages = {}
+    with override_settings(COMPRESSION_ENABLED=False):
+        for name, request in build_pages(user):
+            response = request(client)
+            if response.status_code != 200:
+                raise RuntimeError(f'Request failed with status {response.status_code}')
+            body = response.content
+            pages[name] = {
+                'cards': cards if name.startswith('activities') else None,
+                'bytes': len(body),
+                **{
+                    pipeline: measure(function, body, iterations)
+                    for pipeline, function in pipelines(response.charset).items()
+                },
+            }
+
+    return {
+        'revision': git_revision(),
+        'brotli': compression.brotli is not None,
+        'gzip_level': settings.COMPRESSION_GZIP_LEVEL,
+        'brotli_quality': settings.COMPRESSION_BROTLI_QUALITY,
+        'user': user.email,
+        'pages': pages,
+    }
@@ -0,0 +1,147 @@
+"""
+WSGI vs ASGI concurrency benchmark for the activities JSON endpoints.
+
+Many simulated clients request get_favorites, activity_detail and
+create_activity at the same time. Under WSGI each client is a thread, as on
+a threaded server; under ASGI each client is a task driving Django's ASGI
+handler on one event loop. Whether the endpoints are served by the sync or
+the async views depends on settings.ASYNC_VIEWS when the URLconf is loaded,
+so each server mode runs in its own process (see the concurrency_benchmark
+command).
+"""
+import asyncio
+import statistics
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from activities.models import Activity
+from core.profiling import percentile
+
+# Each client cycles through this mix: mostly reads with a write every fifth request
+MIX = ['get_favorites', 'activity_detail', 'get_favorites', 'activity_detail', 'create_activity']
+
+
+def plan(users):
+    """Return the favorites and detail URLs to request for each user"""
+    targets = []
+    for user in users:
+        activity = Activity.objects.filter(user=user).order_by('-occurred_at').first()
+        if activity is None:
+            raise ValueError(f'{user.email} has no activities; run manage.py seed_benchmark first')
+        targets.append({
+            'user': user,
+            'get_favorites': reverse('activities:get_favorites', args=['consume']),
+            'activity_detail': reverse('activities:activity_detail', args=[activity.pk]),
+            'create_activity': reverse('activities:create'),
+        })
+    return targets
+
+
+def create_payload(client_index, request_index):
+    return {
+        'name': f'Concurrency {client_index}-{request_index}',
+        'category': 'consume',
+        'ingredients': ['Rice', 'Beans'],
+    }
+
+
+def summarize(server, clients, timings, failures, elapsed):
+    timings.sort()
+    return {
+        'server': server,
+        'async_views': settings.ASYNC_VIEWS,
+        'database': connection.vendor,
+        'clients': clients,
+        'requests': len(timings),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'failures': failures,
+    }
+
+
+# The test clients always send Host: testserver
+test_hosts = override_settings(ALLOWED_HOSTS=['testserver'])
+
+
+@test_hosts
+def run_wsgi(users, clients=200, requests=10):
+    """One thread per client, each with its own database connection"""
+    targets = plan(users)
+    barrier = threading.Barrier(clients + 1)
+    timings, failures = [], []
+
+    def client_thread(index):
+        target = targets[index % len(targets)]
+        client = Client(raise_request_exception=False)
+        client.force_login(target['user'])
+        barrier.wait()
+        try:
+            for request_index in range(requests):
+                kind = MIX[(index + request_index) % len(MIX)]
+                started = time.perf_counter()
+                if kind == 'create_activity':
+                    response = client.post(target[kind], create_payload(index, request_index),
+                                           content_type='application/json')
+                else:
+                    response = client.get(target[kind], HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 400:
+                    failures.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client_thread, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    close_old_connections()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return summarize('wsgi', clients, timings, len(failures), time.perf_counter() - started)
+
+
+@test_hosts
+def run_asgi(users, clients=200, requests=10):
+    """One task per client on a single event loop"""
+    targets = plan(users)
+    timings, failures = [], []
+
+    async def client_task(index, client, start):
+        target = targets[index % len(targets)]
+        await start.wait()
+        for request_index in range(requests):
+            kind = MIX[(index + request_index) % len(MIX)]
+            started = time.perf_counter()
+            if kind == 'create_activity':
+                response = await client.post(target[kind], create_payload(index, request_index),
+                                             content_type='application/json')
+            else:
+                response = await client.get(target[kind], headers={'X-Requested-With': 'XMLHttpRequest'})
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                failures.append(response.status_code)
+
+    async def main():
+        start = asyncio.Event()
+        tasks = []
+        for index in range(clients):
+            client = AsyncClient(raise_request_exception=False)
+            await sync_to_async(client.force_login)(targets[index % len(targets)]['user'])
+            tasks.append(asyncio.create_task(client_task(index, client, start)))
+        started = time.perf_counter()
+        start.set()
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(main())
+    return summarize('asgi', clients, timings, len(failures), elapsed)
@@ -0,0 +1,119 @@
+"""
+Synthetic activity history for benchmarks.
+
+Seeded users get a deterministic mix of meals, workouts and sleep spread over
+the past year, written through ActivityImporter so ingredients, favorites and
+dashboard rollups look exactly like imported data.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.utils import timezone
+
+from activities.importer import ActivityImporter
+from activities.models import Activity, ActivityCategory
+
+EMAIL_PREFIX = 'bench'
+EMAIL_TEMPLATE = EMAIL_PREFIX + '{}@example.com'
+PASSWORD = 'benchmark'
+
+TIMEZONES = [
+    'UTC', 'America/Toronto', 'America/Los_Angeles', 'Europe/London',
+    'Europe/Berlin', 'Asia/Kolkata', 'Asia/Tokyo', 'Australia/Sydney',
+]
+
+CATEGORIES = [
+    ('consume', 'Consume', 'green'),
+    ('exercise', 'Exercise', 'blue'),
+    ('sleep', 'Sleep', 'purple'),
+]
+
+MEALS = {
+    'Breakfast': [
+        ['Eggs', 'Toast', 'Butter'], ['Oatmeal', 'Blueberries', 'Honey'],
+        ['Greek Yogurt', 'Granola', 'Strawberries'], ['Bagel', 'Cream Cheese', 'Smoked Salmon'],
+    ],
+    'Lunch': [
+        ['Chicken Breast', 'Lettuce', 'Tomato', 'Cucumber', 'Olive Oil'],
+        ['Turkey', 'Whole Wheat Bread', 'Cheddar', 'Mustard'],
+        ['Quinoa', 'Black Beans', 'Corn', 'Avocado', 'Lime'],
+        ['Tuna', 'Mayonnaise', 'Celery', 'Rye Bread'],
+    ],
+    'Dinner': [
+        ['Salmon', 'Rice', 'Broccoli', 'Soy Sauce'],
+        ['Pasta', 'Tomato Sauce', 'Ground Beef', 'Parmesan', 'Basil'],
+        ['Tofu', 'Bell Pepper', 'Onion', 'Garlic', 'Ginger', 'Rice Noodles'],
+        ['Steak', 'Potatoes', 'Green Beans', 'Butter'],
+    ],
+    'Snack': [
+        ['Apple', 'Peanut Butter'], ['Almonds'], ['Carrots', 'Hummus'], ['Dark Chocolate'],
+    ],
+}
+
+WORKOUTS = ['Run', 'Cycling', 'Swim', 'Yoga', 'Strength Training', 'Walk']
+
+
+def generate_rows(count, rng, days=365):
+    """Yield (line number, row) pairs for ActivityImporter, newest first"""
+    now = timezone.now()
+    meals = list(MEALS)
+    for line_number in range(1, count + 1):
+        occurred_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        roll = rng.random()
+        if roll < 0.7:
+            meal = rng.choice(meals)
+            ingredients = rng.choice(MEALS[meal])
+            row = {
+                'name': meal,
+                'category': 'consume',
+                'description': f"{meal} with {ingredients[0].lower()}",
+                'ingredients': ingredients,
+                # A handful of repeated meals become favorites; duplicates are dropped by the importer
+                'favorite': rng.random() < 0.05,
+            }
+        elif roll < 0.9:
+            row = {'name': rng.choice(WORKOUTS), 'category': 'exercise', 'description': f"{rng.randint(15, 90)} minutes"}
+        else:
+            row = {'name': 'Sleep', 'category': 'sleep', 'description': f"{rng.randint(5, 9)} hours"}
+        row['occurred_at'] = occurred_at.isoformat()
+        yield line_number, row
+
+
+def ensure_categories():
+    for slug, name, color in CATEGORIES:
+        ActivityCategory.objects.get_or_create(slug=slug, defaults={'name': name, 'color': color})
+
+
+def benchmark_users():
+    """Return the users created by seed()"""
+    return get_user_model().objects.filter(
+        email__startswith=EMAIL_PREFIX, email__endswith='@example.com',
+    ).order_by('email')
+
+
+def seed(users=5, activities=1000, seed=0, chunk_size=500):
+    """Create or refill benchmark users with synthetic activities and return them"""
+    rng = random.Random(seed)
+    ensure_categories()
+    User = get_user_model()
+    seeded = []
+    for index in range(users):
+        user, created = User.objects.get_or_create(
+            email=EMAIL_TEMPLATE.format(index),
+            defaults={'name': f'Benchmark User {index}', 'timezone': TIMEZONES[index % len(TIMEZONES)]},
+        )
+        if created:
+            user.set_password(PASSWORD)
+            user.save(update_fields=['password'])
+        else:
+            # Re-seeding replaces the previous history; deleting activities cascades to consumptions
+            Activity.objects.filter(user=user).delete()
+            user.daily_rollups.all().delete()
+
+        ActivityImporter(user, chunk_size=chunk_size).run(generate_rows(activities, rng))
+        # bulk_create stamps every row with the same created_at; spread them like real history
+        Activity.objects.filter(user=user).update(created_at=F('occurred_at'))
+        seeded.append(user)
+    return seeded
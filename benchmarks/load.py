@@ -0,0 +1,91 @@
+"""
+Concurrent load test for the activity write path.
+
+Worker threads log in as seeded benchmark users and hammer create_activity,
+interleaved with list reads, each thread on its own database connection as
+under a threaded WSGI server. The result reports throughput, latency and how
+many requests failed (for SQLite, typically "database is locked").
+"""
+import statistics
+import threading
+import time
+from itertools import count
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.urls import reverse
+
+from core.profiling import percentile
+
+
+def worker(user, requests, write_ratio, host, serial, barrier, results):
+    client = Client(HTTP_HOST=host, raise_request_exception=False)
+    client.force_login(user)
+    create_url = reverse('activities:create')
+    list_url = reverse('activities:list')
+    timings, failures, errors = [], 0, {}
+    barrier.wait()
+    try:
+        for index in range(requests):
+            started = time.perf_counter()
+            # Spread writes evenly through the run at the requested ratio
+            if int((index + 1) * write_ratio) > int(index * write_ratio):
+                response = client.post(create_url, content_type='application/json', data={
+                    'name': f'Load test {next(serial)}',
+                    'category': 'consume',
+                    'ingredients': ['Rice', 'Beans'],
+                })
+            else:
+                response = client.get(list_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                failures += 1
+                exc = getattr(response, 'exc_info', None)
+                reason = str(exc[1]) if exc else f'HTTP {response.status_code}'
+                errors[reason] = errors.get(reason, 0) + 1
+    finally:
+        results.append((timings, failures, errors))
+        connection.close()
+
+
+def run(users, threads=8, requests=50, write_ratio=0.5, host='localhost'):
+    """Run the load test and return throughput, latency and failure counts"""
+    serial = count()
+    barrier = threading.Barrier(threads + 1)
+    results = []
+    workers = [
+        threading.Thread(target=worker, args=(users[i % len(users)], requests, write_ratio, host, serial, barrier, results))
+        for i in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    # Connections made while logging in are not part of the measurement
+    close_old_connections()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings = sorted(t for result in results for t in result[0])
+    errors = {}
+    for _, _, result_errors in results:
+        for reason, number in result_errors.items():
+            errors[reason] = errors.get(reason, 0) + number
+    database = settings.DATABASES['default']
+    return {
+        'database': connection.vendor,
+        'conn_max_age': database.get('CONN_MAX_AGE', 0),
+        'sqlite_pragmas': getattr(settings, 'SQLITE_PRAGMAS', {}) if connection.vendor == 'sqlite' else None,
+        'threads': threads,
+        'requests': len(timings),
+        'write_ratio': write_ratio,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'failures': sum(result[1] for result in results),
+        'errors': errors,
+    }
@@ -0,0 +1,72 @@
+"""
+Benchmark full-text search against icontains scans.
+
+Both strategies fetch the same first page of ids for a seeded user: the
+search index ranks with bm25 (SQLite) or ts_rank (PostgreSQL), while the
+baseline ORs icontains lookups across the activity, consumption and
+ingredient tables like the admin's search_fields do.
+"""
+import statistics
+import time
+
+from django.db import connection
+
+from activities.models import Activity
+from activities.search import icontains_queryset, ranked_ids, search_terms
+from core.profiling import percentile
+
+from .activities import git_revision
+
+# A common ingredient, a rarer one, a prefix, two-term ingredient and workout names,
+# and a word nothing matches (the worst case for a LIKE scan)
+QUERIES = ['eggs', 'quinoa', 'chick', 'rice noodles', 'strength training', 'pizza']
+
+
+def strategies(user, per_page):
+    def fts(terms):
+        return ranked_ids(user, terms, per_page + 1)
+
+    def icontains(terms):
+        queryset = icontains_queryset(user, terms).order_by('-created_at', '-id')
+        return list(queryset.values_list('id', flat=True)[:per_page + 1])
+
+    return {'fts': fts, 'icontains': icontains}
+
+
+def measure(function, terms, iterations, warmup):
+    for _ in range(warmup):
+        function(terms)
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        ids = function(terms)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'results': len(ids),
+    }
+
+
+def run(user, queries=QUERIES, iterations=20, warmup=2, per_page=15):
+    """Time the first results page of every query with each strategy"""
+    cases = {}
+    for query in queries:
+        terms = search_terms(query)
+        cases[query] = {
+            name: measure(function, terms, iterations, warmup)
+            for name, function in strategies(user, per_page).items()
+        }
+
+    return {
+        'revision': git_revision(),
+        'database': connection.vendor,
+        'user': user.email,
+        'activities': Activity.objects.filter(user=user).count(),
+        'total_activities': Activity.objects.count(),
+        'cases': cases,
+    }
@@ -0,0 +1,89 @@
+"""
+Database round trips per page view under each session profile.
+
+Every profile in settings.SESSION_PROFILES drives the same authenticated
+page views through the test client with that profile's session engine,
+message storage and authentication backend. Queries are split into session
+table reads/writes, users table reads and everything else, so the cost of
+loading the session and request.user is visible on its own.
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.profiling import percentile
+
+from .activities import git_revision
+
+
+def build_cases(user):
+    """Return (name, callable(client)) pairs for the benchmarked page views"""
+    profile_url = reverse('profile')
+
+    def flash_message(client):
+        # Post the profile form, then follow the redirect that displays the flash message
+        client.post(profile_url, {'name': user.name, 'timezone': user.timezone})
+        return client.get(profile_url)
+
+    return [
+        ('dashboard', lambda client: client.get(reverse('dashboard'))),
+        ('activities', lambda client: client.get(reverse('activities:list'))),
+        ('profile', lambda client: client.get(profile_url)),
+        ('flash_message', flash_message),
+    ]
+
+
+def classify(queries):
+    counts = {'queries': len(queries), 'session_queries': 0, 'user_queries': 0}
+    for query in queries:
+        if 'django_session' in query['sql']:
+            counts['session_queries'] += 1
+        elif 'FROM "users_customuser"' in query['sql']:
+            counts['user_queries'] += 1
+    return counts
+
+
+def measure(client, request, iterations, warmup):
+    for _ in range(warmup):
+        request(client)
+
+    timings = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request(client)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'Request failed with status {response.status_code}')
+
+    timings.sort()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        # Queries of the last iteration, once caches are warm
+        **classify(context.captured_queries),
+    }
+
+
+def run_profile(user, profile, iterations, warmup, host):
+    with override_settings(**settings.SESSION_PROFILES[profile]):
+        client = Client(HTTP_HOST=host)
+        client.force_login(user)
+        return {name: measure(client, request, iterations, warmup) for name, request in build_cases(user)}
+
+
+def run(user, profiles=None, iterations=20, warmup=3, host='localhost'):
+    """Benchmark the page views as the given user under each session profile"""
+    profiles = profiles or list(settings.SESSION_PROFILES)
+    return {
+        'revision': git_revision(),
+        'database': connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'],
+        'user': user.email,
+        'profiles': {profile: run_profile(user, profile, iterations, warmup, host) for profile in profiles},
+    }
@@ -0,0 +1,104 @@
+"""
+Render-time benchmark for the main page templates under each template profile.
+
+The pages are requested once through the test client as a seeded user to
+capture the context each template is rendered with. Every profile in
+settings.TEMPLATE_PROFILES then gets a fresh engine, so the first render
+includes compiling the template and everything it extends and includes,
+followed by timed renders of the same context. A separate fresh engine per
+profile times core.templates.warm_up.
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.template.base import Template
+from django.test import Client
+from django.test.signals import template_rendered
+from django.test.utils import instrumented_test_render
+from django.urls import reverse
+
+from core.profiling import percentile
+from core.templates import profile_engine, warm_up
+
+from .activities import AJAX, git_revision
+
+TEMPLATES = ['dashboard/dashboard.html', 'activities/activities.html', 'activities/partials/activities_list.html']
+
+
+def capture_contexts(user, host):
+    """Return {template name: (flattened context, request)} for the benchmarked templates"""
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+    requests = [
+        lambda: client.get(reverse('dashboard')),
+        lambda: client.get(reverse('activities:list')),
+        lambda: client.get(reverse('activities:list'), **AJAX),
+    ]
+
+    contexts = {}
+
+    def store(sender, template, context, **kwargs):
+        if template.name in TEMPLATES and template.name not in contexts:
+            contexts[template.name] = (context.flatten(), context.request)
+
+    # template_rendered is only sent while template rendering is instrumented
+    original_render = Template._render
+    Template._render = instrumented_test_render
+    template_rendered.connect(store)
+    try:
+        for request in requests:
+            response = request()
+            if response.status_code != 200:
+                raise RuntimeError(f'Request failed with status {response.status_code}')
+    finally:
+        template_rendered.disconnect(store)
+        Template._render = original_render
+    return contexts
+
+
+def measure(engine, name, context, request, iterations):
+    started = time.perf_counter()
+    template = engine.get_template(name)
+    template.render(context, request)
+    first = (time.perf_counter() - started) * 1000
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        # get_template() is part of every request's cost, and what the cached loader saves
+        engine.get_template(name).render(context, request)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'first_ms': round(first, 3),
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+    }
+
+
+def run_profile(profile, contexts, iterations):
+    options = settings.TEMPLATE_PROFILES[profile]
+    engine = profile_engine(options)
+    results = {
+        name: measure(engine, name, context, request, iterations)
+        for name, (context, request) in contexts.items()
+    }
+
+    started = time.perf_counter()
+    compiled = warm_up(profile_engine(options))
+    results['warm_up'] = {'templates': compiled, 'ms': round((time.perf_counter() - started) * 1000, 3)}
+    return results
+
+
+def run(user, profiles=None, iterations=50, host='localhost'):
+    """Benchmark rendering the page templates with the given user's context under each profile"""
+    contexts = capture_contexts(user, host)
+    profiles = profiles or list(settings.TEMPLATE_PROFILES)
+    return {
+        'revision': git_revision(),
+        'user': user.email,
+        'profiles': {profile: run_profile(profile, contexts, iterations) for profile in profiles},
+    }
@@ -0,0 +1,99 @@
+"""
+Microbenchmark for the cached timezone helpers in core.timezones.
+
+Compares building ZoneInfo objects and local day boundaries on every call
+(what the middleware and list view used to do) against the cached helpers,
+the tzdata scan users.models used to run on import against the cached name
+list, and linear scans of the timezone names against the set lookup and
+prefix index used for validation and the timezone picker.
+
+Usage: python -m benchmarks.timezones [--number N]
+"""
+import argparse
+import timeit
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo, available_timezones
+
+from core.timezones import UTC, day_range, get_zone, is_timezone, search_timezones, timezone_choices, timezone_names
+
+ZONE = 'America/Toronto'
+DAY = date(2025, 3, 9)
+# Late in the alphabet, so a linear scan of the choices walks nearly all of them
+CHOICE = 'Pacific/Wallis'
+QUERY = 'new'
+
+
+def uncached_zone():
+    return ZoneInfo(ZONE)
+
+
+def uncached_day_range():
+    zone = ZoneInfo(ZONE)
+    start = datetime.combine(DAY, time.min, tzinfo=zone)
+    end = datetime.combine(DAY, time.max, tzinfo=zone)
+    return start.astimezone(ZoneInfo('UTC')), end.astimezone(ZoneInfo('UTC'))
+
+
+def cached_zone():
+    return get_zone(ZONE)
+
+
+def cached_day_range():
+    return day_range(ZONE, DAY)
+
+
+def scanned_choices():
+    return [(tz, tz) for tz in sorted(available_timezones())]
+
+
+def cached_choices():
+    return timezone_names()
+
+
+def scanned_validation():
+    return any(value == CHOICE for value, _ in timezone_choices())
+
+
+def set_validation():
+    return is_timezone(CHOICE)
+
+
+def scanned_search():
+    return [name for name in timezone_names() if any(part.lower().startswith(QUERY) for part in name.split('/'))]
+
+
+def indexed_search():
+    return search_timezones(QUERY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=200_000, help='Calls per case')
+    args = parser.parse_args()
+
+    assert cached_day_range() == uncached_day_range()
+    assert cached_day_range()[0].tzinfo is UTC
+    assert scanned_validation() and set_validation()
+    assert set(indexed_search()) <= set(scanned_search())
+
+    cases = [
+        ('zone (uncached)', uncached_zone),
+        ('zone (cached)', cached_zone),
+        ('day range (uncached)', uncached_day_range),
+        ('day range (cached)', cached_day_range),
+        ('choices (tzdata scan)', scanned_choices),
+        ('choices (cached)', cached_choices),
+        ('validate (list scan)', scanned_validation),
+        ('validate (set)', set_validation),
+        ('search (scan)', scanned_search),
+        ('search (prefix index)', indexed_search),
+    ]
+    for label, func in cases:
+        # The tzdata scan and linear searches are far slower, so run them fewer times
+        number = args.number if 'scan' not in label else max(1, args.number // 1000)
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        print(f'{label:<22} {best / number * 1e9:12.0f} ns/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+Third-party front-end assets, loaded from cdnjs or from vendored copies.
+
+With settings.VENDORED_ASSETS on, pages reference copies under
+static/vendor/ instead (fetched with `manage.py vendor_assets`), so they
+work offline and go through the fingerprinted, precompressed static
+pipeline like the app's own files.
+"""
+CDNJS = 'https://cdnjs.cloudflare.com/ajax/libs/'
+
+# Asset name -> path below CDNJS, also used below static/vendor/
+ASSETS = {
+    'flowbite.css': 'flowbite/2.2.1/flowbite.min.css',
+    'flowbite.js': 'flowbite/2.2.1/flowbite.min.js',
+    'fontawesome.css': 'font-awesome/6.5.1/css/all.min.css',
+}
+
+
+def cdn_url(path):
+    return CDNJS + path
+
+
+def vendor_path(path):
+    return f'vendor/{path}'
@@ -0,0 +1,256 @@
+"""
+HTML minification and response compression.
+
+CompressionMiddleware collapses the whitespace and comments the templates
+carry into every page (the activity cards repeat long indented Tailwind
+markup) and then gzip- or brotli-encodes text responses for clients that
+accept it. Responses under COMPRESSION_MIN_SIZE are sent as they are, since
+the encoding overhead outweighs the savings. Streaming responses are never
+buffered or minified: their chunks are compressed as they pass through.
+"""
+import re
+import secrets
+import struct
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types worth compressing; images, archives and fonts already are
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml', 'application/x-ndjson',
+    'image/svg+xml',
+}
+
+# Blocks whose whitespace is significant and left untouched
+PRESERVED_RE = _lazy_re_compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL)
+# Comments, except conditional comments
+COMMENT_RE = _lazy_re_compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+# A tag, including quoted attribute values that contain '>'
+TAG_RE = _lazy_re_compile(r'(<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>)')
+# Whitespace at the edges of a text node, next to a tag
+EDGE_WHITESPACE_RE = _lazy_re_compile(r'^\s+|\s+$')
+
+
+def collapse(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def minify_html(html):
+    """
+    Collapse the whitespace between tags and drop comments outside pre, textarea, script and style.
+
+    Browsers render any whitespace run as one space, so each run next to a tag
+    is kept as a single newline (if it spanned lines) or space and the page
+    looks the same. Tags (and so attribute values) and the whitespace inside
+    text are left as they are, since both can carry user data that is posted
+    back through forms.
+    """
+    parts = PRESERVED_RE.split(html)
+    output = []
+    # split() returns text, block, tag name, text, block, tag name, ...
+    for index in range(0, len(parts), 3):
+        # TAG_RE.split() alternates text and tags, starting with text
+        for position, token in enumerate(TAG_RE.split(COMMENT_RE.sub('', parts[index]))):
+            output.append(EDGE_WHITESPACE_RE.sub(collapse, token) if position % 2 == 0 else token)
+        if index + 1 < len(parts):
+            output.append(parts[index + 1])
+    return ''.join(output)
+
+
+def accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header allows"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        try:
+            quality = float(params.strip().removeprefix('q=')) if params else 1.0
+        except ValueError:
+            quality = 1.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def is_html(response):
+    return response.get('Content-Type', '').startswith('text/html')
+
+
+def choose_encoding(request, response):
+    """The preferred encoding the client accepts and this process can produce, or None"""
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    # Brotli has no header field to pad, so pages that echo request data next to secrets stay gzip
+    padded = settings.COMPRESSION_RANDOM_BYTES and is_html(response)
+    if brotli is not None and 'br' in accepted and not padded:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def gzip_header(random_bytes):
+    """
+    A gzip member header whose file name is up to random_bytes - 1 filler bytes.
+
+    Decoders skip the name, but its random length varies the size of the
+    response, as Django's GZipMiddleware does against BREACH.
+    """
+    if not random_bytes:
+        return b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+    # FNAME flag, zero mtime, no extra flags, unknown OS
+    return b'\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff' + b'a' * secrets.randbelow(random_bytes) + b'\x00'
+
+
+class GzipCompressor:
+    """Incremental gzip encoder that writes its own (optionally padded) header"""
+
+    def __init__(self, random_bytes=0):
+        # Negative wbits gives a raw deflate stream without zlib's header and trailer
+        self.deflate = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, -15)
+        self.header = gzip_header(random_bytes)
+        self.crc = 0
+        self.size = 0
+
+    def compress(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        output, self.header = self.header + self.deflate.compress(data), b''
+        return output
+
+    def finish(self):
+        return self.header + self.deflate.flush() + struct.pack('<II', self.crc, self.size & 0xffffffff)
+
+
+class Compressor:
+    """Incremental gzip or brotli encoder with the levels from settings"""
+
+    def __init__(self, encoding, random_bytes=0):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            compressor = GzipCompressor(random_bytes)
+            self.compress, self.finish = compressor.compress, compressor.finish
+
+
+def compress(data, encoding, random_bytes=0):
+    compressor = Compressor(encoding, random_bytes)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(chunks, encoding, random_bytes=0):
+    compressor = Compressor(encoding, random_bytes)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding, random_bytes=0):
+    compressor = Compressor(encoding, random_bytes)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding'):
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES
+
+
+def weaken_etag(response):
+    # The encoded body differs byte for byte, so a strong validator no longer holds
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware:
+    """
+    Middleware that minifies HTML and gzip/brotli-encodes text responses.
+
+    Compressing a page that reflects request data next to a secret (the CSRF
+    token, the user's own entries) exposes it to BREACH, where an attacker
+    guesses the secret from the compressed length. As in Django's
+    GZipMiddleware, HTML responses get a random-length (0 to
+    COMPRESSION_RANDOM_BYTES - 1 bytes) file name in their gzip header, and are
+    never brotli-encoded since brotli has nowhere to put the padding. This only
+    makes the attack slower; views serving long-lived secrets should not
+    reflect attacker input. COMPRESSION_RANDOM_BYTES = 0 turns the padding off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not getattr(settings, 'COMPRESSION_ENABLED', False) or not is_compressible(response):
+            return response
+
+        if response.streaming:
+            return self.process_streaming(request, response)
+
+        if getattr(settings, 'HTML_MINIFY', False) and is_html(response):
+            response.content = minify_html(response.content.decode(response.charset)).encode(response.charset)
+            response.headers['Content-Length'] = str(len(response.content))
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, response)
+        if encoding is None or len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        compressed = compress(response.content, encoding, self.random_bytes(response))
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        weaken_etag(response)
+        return response
+
+    def random_bytes(self, response):
+        return settings.COMPRESSION_RANDOM_BYTES if is_html(response) else 0
+
+    def process_streaming(self, request, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, response)
+        if encoding is None:
+            return response
+
+        # The length of a stream is unknown up front, so the size threshold does not apply
+        random_bytes = self.random_bytes(response)
+        if response.is_async:
+            response.streaming_content = acompress_stream(response.streaming_content, encoding, random_bytes)
+        else:
+            response.streaming_content = compress_stream(response.streaming_content, encoding, random_bytes)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        weaken_etag(response)
+        return response
@@ -0,0 +1,38 @@
+"""
+Template context shared by every page.
+
+navbar reverses the links base.html renders once per process (per script
+prefix and URLconf) and works out which navbar item is current, so the
+shell template no longer runs a {% url %} tag or a request.path comparison
+for each link on every render.
+"""
+from functools import lru_cache
+
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+# Template key -> URL name
+NAVBAR_URLS = {
+    'dashboard': 'dashboard',
+    'activities': 'activities:list',
+    'profile': 'profile',
+    'login': 'login',
+    'signup': 'signup',
+    'logout': 'logout',
+    'privacy_policy': 'privacy_policy',
+    'terms_conditions': 'terms_conditions',
+}
+
+# Items highlighted when they are the current page
+NAVBAR_ITEMS = ('dashboard', 'activities', 'profile')
+
+
+@lru_cache
+def navbar_urls(script_prefix, urlconf):
+    return {key: reverse(name, urlconf=urlconf) for key, name in NAVBAR_URLS.items()}
+
+
+def navbar(request):
+    """Add navbar.urls (the base.html links) and navbar.active (the current item, or None)"""
+    urls = navbar_urls(get_script_prefix(), get_urlconf())
+    active = next((item for item in NAVBAR_ITEMS if urls[item] == request.path), None)
+    return {'navbar': {'urls': urls, 'active': active}}
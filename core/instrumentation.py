@@ -0,0 +1,127 @@
+"""
+Request-scoped, sampled instrumentation.
+
+Tracing is off by default (TRACE_SAMPLE_RATE = 0). When a request is sampled,
+TraceMiddleware collects events and timed spans recorded with trace() and
+span() and emits them as a single structured log record on the
+'lifetracker.trace' logger when the response is ready. Unsampled requests
+only pay for a context variable lookup; event fields are passed as raw
+objects and only formatted when a trace is written out.
+"""
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('lifetracker.trace')
+
+_current_trace = ContextVar('lifetracker_trace', default=None)
+
+
+class Trace:
+    """Events and spans recorded for one sampled request"""
+
+    def __init__(self, request):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = request.method
+        self.path = request.path
+        self.started = time.perf_counter()
+        self.events = []
+
+    def add(self, event, fields):
+        fields['event'] = event
+        fields['at_ms'] = round((time.perf_counter() - self.started) * 1000, 3)
+        self.events.append(fields)
+
+    def as_dict(self, status):
+        return {
+            'trace_id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'status': status,
+            'duration_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'events': self.events,
+        }
+
+
+def tracing():
+    """Return True when the current request is being traced"""
+    return _current_trace.get() is not None
+
+
+def trace(event, **fields):
+    """Record an event with arbitrary fields on the current trace, if any"""
+    current = _current_trace.get()
+    if current is not None:
+        current.add(event, fields)
+
+
+@contextmanager
+def span(event, **fields):
+    """Time the wrapped block and record it as an event on the current trace, if any"""
+    current = _current_trace.get()
+    if current is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        fields['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        current.add(event, fields)
+
+
+def should_sample():
+    rate = getattr(settings, 'TRACE_SAMPLE_RATE', 0)
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+class TraceMiddleware:
+    """Middleware that samples requests for tracing and logs each sampled trace."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not should_sample():
+            return self.get_response(request)
+
+        current = Trace(request)
+        token = _current_trace.set(current)
+        status = None
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            _current_trace.reset(token)
+            logger.info(json.dumps(current.as_dict(status), default=str))
+
+    async def __acall__(self, request):
+        if not should_sample():
+            return await self.get_response(request)
+
+        current = Trace(request)
+        token = _current_trace.set(current)
+        status = None
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            _current_trace.reset(token)
+            logger.info(json.dumps(current.as_dict(status), default=str))
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import read_entries, summarize
+
+COLUMNS = [
+    ('view', 'View', 32),
+    ('requests', 'Reqs', 6),
+    ('avg_queries', 'Avg Q', 6),
+    ('max_queries', 'Max Q', 6),
+    ('budget', 'Budget', 6),
+    ('over_budget', 'Over', 5),
+    ('avg_sql_ms', 'SQL ms', 8),
+    ('avg_render_ms', 'Render ms', 9),
+    ('p50_ms', 'p50 ms', 8),
+    ('p95_ms', 'p95 ms', 8),
+]
+SORT_KEYS = ('p95_ms', 'avg_queries', 'avg_sql_ms', 'requests', 'view')
+
+
+class Command(BaseCommand):
+    help = 'Report query counts and latency per URL name from the profiling log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='Profiling log to read (default: settings.PROFILING_LOG)')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='p95_ms', help='Column to sort by (default: p95_ms)')
+        parser.add_argument('--clear', action='store_true', help='Truncate the log after reporting')
+
+    def handle(self, *args, log=None, sort='p95_ms', clear=False, **options):
+        path = Path(log or settings.PROFILING_LOG)
+        if not path.exists():
+            raise CommandError(f'No profiling log at {path}; enable PROFILING_ENABLED and make some requests')
+
+        report = summarize(read_entries(path))
+        report.sort(key=lambda row: row[sort], reverse=sort != 'view')
+
+        self.stdout.write(' '.join(title.ljust(width) for _, title, width in COLUMNS))
+        for row in report:
+            self.stdout.write(' '.join(
+                str('-' if row[key] is None else row[key]).ljust(width) for key, _, width in COLUMNS
+            ))
+
+        over = [row['view'] for row in report if row['over_budget']]
+        if over:
+            self.stdout.write(self.style.WARNING(f"Over query budget: {', '.join(over)}"))
+
+        if clear:
+            path.write_text('')
@@ -0,0 +1,52 @@
+import posixpath
+import re
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.assets import ASSETS, cdn_url, vendor_path
+
+# url(...) references inside CSS, e.g. the Font Awesome webfonts
+CSS_URL_RE = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+
+
+class Command(BaseCommand):
+    help = 'Download the cdnjs assets (and the files their CSS references) into static/vendor/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Download files that already exist')
+
+    def handle(self, *args, force=False, **options):
+        self.root = settings.BASE_DIR / 'static'
+        self.force = force
+        for path in ASSETS.values():
+            content = self.fetch(path)
+            if path.endswith('.css'):
+                for reference in sorted(set(CSS_URL_RE.findall(content.decode()))):
+                    # Fonts and images are addressed relative to the stylesheet
+                    if reference.startswith(('data:', 'http:', 'https:', '/', '#')):
+                        continue
+                    reference = reference.split('?')[0].split('#')[0]
+                    self.fetch(posixpath.normpath(posixpath.join(posixpath.dirname(path), reference)))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Vendored assets are in {self.root / "vendor"}; set LIFETRACKER_VENDORED_ASSETS=1 to use them'
+        ))
+
+    def fetch(self, path):
+        target = self.root / vendor_path(path)
+        if target.exists() and not self.force:
+            return target.read_bytes()
+
+        try:
+            with urlopen(cdn_url(path), timeout=30) as response:
+                content = response.read()
+        except URLError as e:
+            raise CommandError(f'Could not download {cdn_url(path)}: {e}')
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        self.stdout.write(f'{vendor_path(path)} ({len(content)} bytes)')
+        return content
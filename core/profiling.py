@@ -0,0 +1,210 @@
+"""
+Per-request query and latency profiling.
+
+ProfilingMiddleware counts the database queries each request issues, the
+time spent in SQL and in template rendering, and reports them as a
+Server-Timing header. Each profiled request is also appended as one JSON line
+to PROFILING_LOG, which the profile_report management command aggregates
+per URL name. Views listed in QUERY_BUDGETS log a warning on the
+'lifetracker.profiling' logger whenever they issue more queries than allowed.
+"""
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import Template
+
+logger = logging.getLogger('lifetracker.profiling')
+
+_current_profile = ContextVar('lifetracker_profile', default=None)
+_log_lock = threading.Lock()
+_templates_instrumented = False
+
+
+class Profile:
+    """Query and render timings collected for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+
+    def record(self, started):
+        self.queries += 1
+        self.sql_time += time.perf_counter() - started
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that times queries against the current request's profile, if any"""
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record(started)
+
+
+def instrument_connection():
+    """Install record_query on this thread's database connection"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_templates():
+    """Wrap top-level template rendering so the active profile can time it"""
+    global _templates_instrumented
+    if _templates_instrumented:
+        return
+    _templates_instrumented = True
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        profile = _current_profile.get()
+        if profile is None:
+            return render(self, context, request)
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            profile.render_time += time.perf_counter() - started
+
+    Template.render = timed_render
+
+
+def server_timing(profile, total):
+    """Format a profile as a Server-Timing header value"""
+    return ', '.join([
+        f'db;desc="{profile.queries} queries";dur={profile.sql_time * 1000:.1f}',
+        f'render;dur={profile.render_time * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+def write_entry(entry):
+    path = getattr(settings, 'PROFILING_LOG', None)
+    if not path:
+        return
+    line = json.dumps(entry) + '\n'
+    with _log_lock, open(path, 'a', encoding='utf-8') as log:
+        log.write(line)
+
+
+class ProfilingMiddleware:
+    """Middleware that profiles queries, SQL time and render time per view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        if getattr(settings, 'PROFILING_ENABLED', False):
+            instrument_templates()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            return self.get_response(request)
+
+        instrument_connection()
+        profile = Profile()
+        token = _current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            return await self.get_response(request)
+
+        # The ORM runs in the request's sync thread; the profile reaches it through the context
+        await sync_to_async(instrument_connection)()
+        profile = Profile()
+        token = _current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.report(request, response, profile)
+
+    def report(self, request, response, profile):
+        total = profile.total_time
+        response['Server-Timing'] = server_timing(profile, total)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        if view_name:
+            budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+            if budget is not None and profile.queries > budget:
+                logger.warning(
+                    'Query budget exceeded for %s: %d queries (budget %d) on %s %s',
+                    view_name, profile.queries, budget, request.method, request.path,
+                )
+            write_entry({
+                'view': view_name,
+                'method': request.method,
+                'status': response.status_code,
+                'queries': profile.queries,
+                'sql_ms': round(profile.sql_time * 1000, 3),
+                'render_ms': round(profile.render_time * 1000, 3),
+                'total_ms': round(total * 1000, 3),
+                'budget': budget,
+            })
+        return response
+
+
+def read_entries(path):
+    """Yield the profiled requests recorded in a profiling log"""
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            if line.strip():
+                yield json.loads(line)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(entries):
+    """Aggregate profiled requests into one row of statistics per URL name"""
+    by_view = {}
+    for entry in entries:
+        by_view.setdefault(entry['view'], []).append(entry)
+
+    report = []
+    for view, rows in by_view.items():
+        totals = sorted(row['total_ms'] for row in rows)
+        queries = [row['queries'] for row in rows]
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view)
+        report.append({
+            'view': view,
+            'requests': len(rows),
+            'avg_queries': round(sum(queries) / len(rows), 1),
+            'max_queries': max(queries),
+            'budget': budget,
+            'over_budget': sum(1 for q in queries if budget is not None and q > budget),
+            'avg_sql_ms': round(sum(row['sql_ms'] for row in rows) / len(rows), 1),
+            'avg_render_ms': round(sum(row['render_ms'] for row in rows) / len(rows), 1),
+            'p50_ms': round(percentile(totals, 0.5), 1),
+            'p95_ms': round(percentile(totals, 0.95), 1),
+        })
+    return report
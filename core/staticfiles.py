@@ -0,0 +1,81 @@
+"""
+Static file storage that fingerprints and precompresses assets.
+
+CompressedManifestStaticFilesStorage is ManifestStaticFilesStorage (content
+hashes in file names, rewritten url() references in CSS) that also writes
+.gz and, when the optional brotli package is installed, .br siblings of
+every compressible file during collectstatic. core.views.serve_static picks
+the best sibling for each request, so nothing is compressed per request.
+"""
+import gzip
+import re
+from pathlib import PurePosixPath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Files that compress well; images and fonts like woff2 are already compressed
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ttf', '.otf', '.eot', '.ico'}
+
+# Smaller files gain nothing once headers are counted
+MIN_COMPRESS_SIZE = 256
+
+# Matches the content hash ManifestStaticFilesStorage adds, e.g. custom.3b5d5c3712ef.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress(data):
+    """Return {encoding: compressed bytes} for the encodings worth storing"""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    # Only keep variants that save at least 5%
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data) * 0.95}
+
+
+def is_hashed(name):
+    """Whether a static file name carries a content hash, so its content never changes"""
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that writes precompressed siblings of its output"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name, hashed_name in self.hashed_files.items():
+            for path in {name, hashed_name}:
+                if self.exists(path):
+                    self.write_compressed(path)
+
+    def write_compressed(self, path):
+        if PurePosixPath(path).suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+            return
+        with self.open(path) as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+
+        for encoding, body in compress(data).items():
+            compressed_path = path + ENCODINGS[encoding]
+            if self.exists(compressed_path):
+                self.delete(compressed_path)
+            self._save(compressed_path, ContentFile(body))
+
+    def stored_name(self, name):
+        # Before collectstatic has written a manifest (development checkouts, the test
+        # runner) serve files under their plain names instead of failing
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -0,0 +1,61 @@
+"""
+Template warm-up for the production template profile.
+
+With the cached loader a template is compiled the first time it is rendered,
+so the first request for each page of every new worker pays for lexing and
+parsing it (and the templates it extends and includes). warm_up() compiles
+every template under the engine's DIRS up front; lifetracker.wsgi and
+lifetracker.asgi call it at startup when TEMPLATE_WARMUP is on.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger('lifetracker.templates')
+
+
+def template_names(directory):
+    """Names of the templates under a template directory, as get_template() expects them"""
+    directory = Path(directory)
+    return sorted(path.relative_to(directory).as_posix() for path in directory.rglob('*.html'))
+
+
+def is_cached(engine):
+    return any(isinstance(loader, CachedLoader) for loader in engine.engine.template_loaders)
+
+
+def warm_up(engine=None):
+    """Compile every template under the engine's DIRS into its cached loader; return how many"""
+    engine = engine or engines['django']
+    if not is_cached(engine):
+        return 0
+
+    started = time.perf_counter()
+    compiled = 0
+    for directory in engine.dirs:
+        for name in template_names(directory):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError:
+                logger.exception('Could not compile template %s', name)
+            else:
+                compiled += 1
+
+    logger.info('Compiled %d templates in %.1f ms', compiled, (time.perf_counter() - started) * 1000)
+    return compiled
+
+
+def profile_engine(options, name='benchmark'):
+    """A standalone DjangoTemplates engine built from settings.TEMPLATES with the given profile OPTIONS"""
+    config = settings.TEMPLATES[0]
+    return DjangoTemplates({
+        'NAME': name,
+        'DIRS': config['DIRS'],
+        'APP_DIRS': 'loaders' not in options,
+        'OPTIONS': {**config['OPTIONS'], **options},
+    })
@@ -0,0 +1,15 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+
+from core.assets import ASSETS, cdn_url, vendor_path
+
+register = template.Library()
+
+@register.simple_tag
+def asset(name):
+    """URL of a third-party asset: the vendored static copy when VENDORED_ASSETS is on, else cdnjs"""
+    path = ASSETS[name]
+    if settings.VENDORED_ASSETS:
+        return static(vendor_path(path))
+    return cdn_url(path)
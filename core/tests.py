@@ -1,3 +1,192 @@
-from django.test import TestCase
+import gzip
+import json
+import shutil
+import tempfile
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.functional import empty
+
+from .compression import CompressionMiddleware, minify_html
+from .context_processors import navbar
+from .signals import configure_sqlite
+from .staticfiles import is_hashed
+from .templates import profile_engine, template_names, warm_up
+from .views import serve_static
+
+
+class SQLitePragmaTestCase(TestCase):
+    """Tests for the per-connection SQLite pragmas."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234, 'cache_size': -4000})
+    def test_pragmas_are_applied_to_new_connections(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        configure_sqlite(sender=connection.__class__, connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+        self.assertEqual(self.pragma('cache_size'), -4000)
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    """Tests for the precompressed static pipeline and the asset tag."""
+
+    def setUp(self):
+        self.static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.static_root)
+        storage_override = override_settings(STATIC_ROOT=self.static_root)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+        staticfiles_storage._wrapped = empty
+        self.addCleanup(setattr, staticfiles_storage, '_wrapped', empty)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.factory = RequestFactory()
+
+    def hashed_name(self, name):
+        return json.loads((self.static_root / 'staticfiles.json').read_text())['paths'][name]
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        name = self.hashed_name('css/custom.css')
+        self.assertTrue(is_hashed(name))
+        with gzip.open(self.static_root / f'{name}.gz') as f:
+            self.assertEqual(f.read(), (self.static_root / name).read_bytes())
+
+    def test_serve_static_prefers_compressed_sibling(self):
+        name = self.hashed_name('css/custom.css')
+        request = self.factory.get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip, deflate, br;q=0')
+        response = serve_static(request, name)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response.close()
+
+        response = serve_static(self.factory.get(f'/static/{name}'), name)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response.close()
+
+    def test_plain_names_are_revalidated(self):
+        response = serve_static(self.factory.get('/static/css/custom.css'), 'css/custom.css')
+        self.assertIn('no-cache', response['Cache-Control'])
+        response.close()
+
+        request = self.factory.get('/static/css/custom.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(serve_static(request, 'css/custom.css').status_code, 304)
+
+    def test_paths_outside_static_root_are_not_served(self):
+        with self.assertRaises(Http404):
+            serve_static(self.factory.get('/static/'), '../manage.py')
+
+
+class AssetTagTestCase(SimpleTestCase):
+    """Tests for the third-party asset tag."""
+
+    def test_vendored_assets_replace_cdn_urls(self):
+        template = Template("{% load assets %}{% asset 'flowbite.js' %}")
+        self.assertEqual(template.render(Context()), 'https://cdnjs.cloudflare.com/ajax/libs/flowbite/2.2.1/flowbite.min.js')
+        with override_settings(VENDORED_ASSETS=True):
+            self.assertEqual(template.render(Context()), '/static/vendor/flowbite/2.2.1/flowbite.min.js')
+
+
+@override_settings(COMPRESSION_ENABLED=True, HTML_MINIFY=True, COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTestCase(SimpleTestCase):
+    """Tests for HTML minification and response compression."""
+
+    html = '<div class="p-4   m-2">\n    <!-- card -->\n    <span>Eggs</span>\n</div>\n<pre>  keep\n  this</pre>' * 10
+
+    def process(self, response, **headers):
+        request = RequestFactory().get('/', **headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_minify_html_preserves_significant_whitespace(self):
+        self.assertEqual(
+            minify_html('<p>\n    a   b <!-- note --> c\n</p><script>\n  x  =  1\n</script><textarea> t  </textarea>'),
+            '<p>\na   b  c\n</p><script>\n  x  =  1\n</script><textarea> t  </textarea>',
+        )
+
+    def test_minify_html_keeps_attribute_values(self):
+        html = '<div>\n    <input value="a    b" title="x\n  y" data-note=\'1 > 0\'>\n</div>'
+        self.assertEqual(minify_html(html), '<div>\n<input value="a    b" title="x\n  y" data-note=\'1 > 0\'>\n</div>')
+
+    def test_html_is_minified_and_gzipped(self):
+        response = self.process(HttpResponse(self.html), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content).decode(), minify_html(self.html))
+
+    def test_html_gets_random_length_padding(self):
+        lengths = set()
+        for _ in range(20):
+            response = self.process(HttpResponse(self.html), HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(gzip.decompress(response.content).decode(), minify_html(self.html))
+            lengths.add(len(response.content))
+        self.assertGreater(len(lengths), 1)
+
+        with override_settings(COMPRESSION_RANDOM_BYTES=0):
+            sizes = {len(self.process(HttpResponse(self.html), HTTP_ACCEPT_ENCODING='gzip').content) for _ in range(5)}
+        self.assertEqual(len(sizes), 1)
+
+    def test_small_and_binary_responses_are_left_alone(self):
+        response = self.process(HttpResponse('<p>hi</p>'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.process(HttpResponse(b'\0' * 1000, content_type='image/png'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_streaming_responses_are_compressed_chunk_by_chunk(self):
+        consumed = []
+
+        def rows():
+            for number in range(100):
+                consumed.append(number)
+                yield f'row {number}\n'
+
+        response = self.process(StreamingHttpResponse(rows(), content_type='text/csv'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(consumed, [])
+
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body).decode(), ''.join(f'row {number}\n' for number in range(100)))
+
+
+class NavbarContextProcessorTestCase(SimpleTestCase):
+    """Tests for the navbar context processor."""
+
+    def test_current_item_is_active(self):
+        context = navbar(RequestFactory().get(reverse('activities:list')))
+        self.assertEqual(context['navbar']['active'], 'activities')
+        self.assertEqual(context['navbar']['urls']['profile'], reverse('profile'))
+
+    def test_other_pages_have_no_active_item(self):
+        context = navbar(RequestFactory().get(reverse('privacy_policy')))
+        self.assertIsNone(context['navbar']['active'])
+
+
+class TemplateWarmUpTestCase(SimpleTestCase):
+    """Tests for the template profiles and the startup warm-up."""
+
+    def test_warm_up_compiles_every_project_template(self):
+        engine = profile_engine(settings.TEMPLATE_PROFILES['production'])
+        names = template_names(settings.BASE_DIR / 'templates')
+
+        self.assertEqual(warm_up(engine), len(names))
+        cached_loader, = engine.engine.template_loaders
+        self.assertEqual(len(cached_loader.get_template_cache), len(names))
+
+    def test_warm_up_skips_uncached_engines(self):
+        self.assertEqual(warm_up(profile_engine(settings.TEMPLATE_PROFILES['uncached'])), 0)
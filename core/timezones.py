@@ -0,0 +1,97 @@
+"""
+Shared timezone helpers.
+
+ZoneInfo instances and local day boundaries are cached per process, so
+hot paths (middleware, list filters, writes) don't rebuild them on every
+request. The list of timezone names is only read from tzdata the first
+time it is needed (rather than when a worker imports the models), and then
+kept as a sorted tuple, a set for validation and a prefix index for the
+timezone picker.
+"""
+from bisect import bisect_left
+from datetime import datetime, time
+from functools import lru_cache
+from zoneinfo import ZoneInfo, available_timezones
+
+UTC = ZoneInfo('UTC')
+
+
+@lru_cache(maxsize=128)
+def get_zone(name):
+    """Return the ZoneInfo for a timezone name; raises ZoneInfoNotFoundError if unknown"""
+    return ZoneInfo(name)
+
+
+@lru_cache(maxsize=1024)
+def day_range(zone_name, day):
+    """Return the (start, end) of a local calendar day as UTC datetimes, for __range lookups"""
+    zone = get_zone(zone_name)
+    start = datetime.combine(day, time.min, tzinfo=zone)
+    end = datetime.combine(day, time.max, tzinfo=zone)
+    return start.astimezone(UTC), end.astimezone(UTC)
+
+
+def local_date(value, zone_name):
+    """Return the calendar date of an aware datetime in the zone"""
+    return value.astimezone(get_zone(zone_name)).date()
+
+
+@lru_cache(maxsize=None)
+def timezone_names():
+    """Sorted tuple of the available IANA timezone names; scans tzdata on the first call only"""
+    return tuple(sorted(available_timezones()))
+
+
+@lru_cache(maxsize=None)
+def timezone_name_set():
+    return frozenset(timezone_names())
+
+
+def is_timezone(name):
+    """Whether name is an available timezone, as a set lookup"""
+    return name in timezone_name_set()
+
+
+@lru_cache(maxsize=None)
+def timezone_choices():
+    """(name, name) choices for every timezone, for use as a lazy `choices` callable"""
+    return tuple((name, name) for name in timezone_names())
+
+
+@lru_cache(maxsize=None)
+def timezone_index():
+    """
+    Sorted (key, name) pairs for prefix search.
+
+    Every name is indexed under its lowercased full name and each part after
+    a '/', so 'tok' finds Asia/Tokyo and 'america/new' finds America/New_York.
+    """
+    index = []
+    for name in timezone_names():
+        key = name.lower()
+        index.append((key, name))
+        position = key.find('/')
+        while position != -1:
+            index.append((key[position + 1:], name))
+            position = key.find('/', position + 1)
+    index.sort()
+    return index
+
+
+def search_timezones(query, limit=20):
+    """Return up to limit timezone names with a part starting with query (case-insensitive)"""
+    query = query.strip().lower().replace(' ', '_')
+    if not query:
+        return list(timezone_names()[:limit])
+
+    index = timezone_index()
+    matches = []
+    position = bisect_left(index, (query,))
+    while position < len(index) and len(matches) < limit:
+        key, name = index[position]
+        if not key.startswith(query):
+            break
+        if name not in matches:
+            matches.append(name)
+        position += 1
+    return matches
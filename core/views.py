@@ -1,4 +1,22 @@
+import mimetypes
+import posixpath
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from .compression import accepted_encodings
+from .staticfiles import ENCODINGS, is_hashed
+
+# Hashed file names change whenever their content does, so browsers may keep them forever
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
 
 # Create your views here.
 def privacy_policy(request):
@@ -6,3 +24,45 @@ def privacy_policy(request):
 
 def terms_conditions(request):
     return render(request, 'terms-conditions.html')
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve a collected static file, preferring its precompressed .br or .gz sibling.
+
+    Fingerprinted names get a year-long immutable Cache-Control; plain names
+    must be revalidated with If-Modified-Since.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404(f'"{path}" does not exist')
+    if not fullpath.is_file():
+        raise Http404(f'"{path}" does not exist')
+
+    stat = fullpath.stat()
+    immutable = is_hashed(path)
+    if not immutable and not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    served, content_encoding = fullpath, encoding
+    if encoding is None:
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for coding, suffix in ENCODINGS.items():
+            sibling = fullpath.with_name(fullpath.name + suffix)
+            if coding in accepted and sibling.is_file():
+                served, content_encoding = sibling, coding
+                break
+
+    response = FileResponse(served.open('rb'), filename=fullpath.name, content_type=content_type or 'application/octet-stream')
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if immutable:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard daily rollups from the activity history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='emails', metavar='EMAIL',
+                            help='Only rebuild rollups for this user (may be repeated)')
+
+    def handle(self, *args, emails=None, **options):
+        users = None
+        if emails:
+            users = get_user_model().objects.filter(email__in=emails)
+            missing = set(emails) - set(users.values_list('email', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+
+        rows = rebuild_rollups(users)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily rollup rows'))
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from dashboard.rollups import count_activities
+
+
+def backfill_rollups(apps, schema_editor):
+    """Count the activities logged before rollups existed."""
+    Activity = apps.get_model('activities', 'Activity')
+    DailyRollup = apps.get_model('dashboard', 'DailyRollup')
+
+    DailyRollup.objects.all().delete()
+    DailyRollup.objects.bulk_create(
+        [
+            DailyRollup(user_id=user_id, date=date, category_id=category_id, count=count)
+            for (user_id, date, category_id), count in count_activities(Activity.objects.all()).items()
+        ],
+        batch_size=1000,
+    )
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model('dashboard', 'DailyRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('users', '0003_customuser_timezone_field'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, clear_rollups),
+    ]
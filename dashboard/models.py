@@ -1,3 +1,21 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from activities.models import ActivityCategory
+
+
+class DailyRollup(models.Model):
+    """Pre-aggregated activity count per user, local day and category"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_rollups")
+    date = models.DateField(help_text="Day in the user's timezone")
+    category = models.ForeignKey(ActivityCategory, on_delete=models.CASCADE, related_name="daily_rollups")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date", "category"], name="unique_daily_rollup"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.date} {self.category}: {self.count}"
@@ -0,0 +1,141 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from activities.categories import category_registry
+from activities.models import Activity
+from core import timezones
+from .models import DailyRollup
+
+
+def local_date(user, value):
+    """Return the calendar date of a datetime in the user's timezone"""
+    return timezones.local_date(value, user.timezone)
+
+
+def record_activity(user, category_id, occurred_at, delta=1):
+    """Add delta to the rollup for the user's local day and category"""
+    add_to_rollup(user, local_date(user, occurred_at), category_id, delta)
+
+
+def add_to_rollup(user, date, category_id, delta):
+    """Add delta to the user's rollup row for a local day and category, never creating a row from a negative delta"""
+    lookup = {'user': user, 'date': date, 'category_id': category_id}
+    # Counts never drop below zero, even for activities logged before the rollup was counted
+    count = Greatest(F('count') + delta, 0)
+    if DailyRollup.objects.filter(**lookup).update(count=count) or delta <= 0:
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Another request created the row first
+        DailyRollup.objects.filter(**lookup).update(count=count)
+
+
+def add_counts_to_rollups(user, counts):
+    """Add a {(date, category_id): delta} mapping to the user's rollups with a fixed number of queries"""
+    existing = {
+        (rollup.date, rollup.category_id): rollup
+        for rollup in DailyRollup.objects.select_for_update().filter(user=user, date__in={date for date, _ in counts})
+    }
+    created = []
+    for (date, category_id), delta in counts.items():
+        rollup = existing.get((date, category_id))
+        if rollup is not None:
+            rollup.count = max(rollup.count + delta, 0)
+        elif delta > 0:
+            created.append(DailyRollup(user=user, date=date, category_id=category_id, count=delta))
+    DailyRollup.objects.bulk_update(existing.values(), ['count'])
+    DailyRollup.objects.bulk_create(created)
+
+
+def move_activity(user, category_id, old_occurred_at, new_occurred_at):
+    """Move an activity's count when its occurrence time changes local day"""
+    if local_date(user, old_occurred_at) != local_date(user, new_occurred_at):
+        record_activity(user, category_id, old_occurred_at, -1)
+        record_activity(user, category_id, new_occurred_at, 1)
+
+
+def count_activities(activities, batch_size=1000):
+    """
+    Return a {(user_id, local date, category_id): count} Counter for an
+    activities queryset. Also used by the 0002 backfill migration with the
+    historical Activity model, so it only reads fields that migration has.
+    """
+    counts = Counter()
+    rows = activities.values_list('user_id', 'user__timezone', 'category_id', 'occurred_at')
+    for user_id, tz, category_id, occurred_at in rows.iterator(chunk_size=batch_size):
+        counts[user_id, timezones.local_date(occurred_at, tz), category_id] += 1
+    return counts
+
+
+def rebuild_rollups(users=None, batch_size=1000):
+    """Recompute rollups from scratch, for all users or the given queryset of users"""
+    activities = Activity.objects.all()
+    rollups = DailyRollup.objects.all()
+    if users is not None:
+        activities = activities.filter(user__in=users)
+        rollups = rollups.filter(user__in=users)
+
+    counts = count_activities(activities, batch_size)
+
+    with transaction.atomic():
+        rollups.delete()
+        DailyRollup.objects.bulk_create(
+            [
+                DailyRollup(user_id=user_id, date=date, category_id=category_id, count=count)
+                for (user_id, date, category_id), count in counts.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(counts)
+
+
+def dashboard_stats(user):
+    """Return this week's total, the consumption streak and per-category totals from rollups"""
+    today = local_date(user, timezone.now())
+    week_start = today - timedelta(days=today.weekday())
+    rollups = DailyRollup.objects.filter(user=user)
+
+    this_week = rollups.filter(date__gte=week_start, date__lte=today).aggregate(total=Sum('count'))['total'] or 0
+
+    # A streak is still alive if the last logged day was yesterday
+    streak = 0
+    expected = today
+    consume = category_registry.get('consume')
+    consume_days = rollups.filter(category=consume, count__gt=0, date__lte=today).values_list('date', flat=True)
+    for day in consume_days.order_by('-date').iterator():
+        if day == expected or (streak == 0 and day == today - timedelta(days=1)):
+            streak += 1
+            expected = day - timedelta(days=1)
+        else:
+            break
+
+    # Totals are grouped by category id; names, colors and icons come from the registry
+    totals = (
+        rollups.values('category_id')
+        .annotate(total=Sum('count'))
+        .filter(total__gt=0)
+        .order_by('-total')
+    )
+    categories = []
+    for row in totals:
+        category = category_registry.get_by_id(row['category_id'])
+        if category is not None:
+            categories.append({
+                'category__name': category.name,
+                'category__color': category.color,
+                'category__icon': category.icon,
+                'total': row['total'],
+            })
+
+    return {
+        'this_week': this_week,
+        'streak': streak,
+        'categories': categories,
+    }
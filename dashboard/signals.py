@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from .rollups import rebuild_rollups
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_timezone(sender, instance, **kwargs):
+    # Deferred loads leave the field out of __dict__; those instances can't tell whether it changed
+    instance._rollup_timezone = instance.__dict__.get('timezone')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def timezone_changed(sender, instance, created, update_fields=None, **kwargs):
+    """Rebuild the user's rollups when their timezone changes, since rows are bucketed by local day"""
+    previous = getattr(instance, '_rollup_timezone', None)
+    instance._rollup_timezone = instance.timezone
+    if created or previous is None or previous == instance.timezone:
+        return
+    if update_fields is not None and 'timezone' not in update_fields:
+        return
+    rebuild_rollups(users=[instance])
@@ -1,3 +1,89 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from activities.models import Activity, ActivityCategory
+from .models import DailyRollup
+from .rollups import rebuild_rollups
+
+User = get_user_model()
+
+
+class DailyRollupTestCase(TestCase):
+    """Tests for incrementally maintained daily rollups."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='password', timezone='America/Toronto')
+        cls.consume = ActivityCategory.objects.create(name='Consume', slug='consume', color='green')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def rollups(self):
+        return sorted(DailyRollup.objects.filter(count__gt=0).values_list('date', 'category__slug', 'count'))
+
+    def log_meal(self, day, time):
+        data = {'name': 'Meal', 'category': 'consume', 'date': day, 'time': time}
+        self.client.post(reverse('activities:create'), data=data, content_type='application/json')
+        return Activity.objects.latest('id')
+
+    def test_incremental_rollups_match_rebuild(self):
+        # 22:30 in Toronto is the next day in UTC, but counts toward the local day
+        first = self.log_meal('2025-03-01', '22:30')
+        self.log_meal('2025-03-01', '08:00')
+        second = self.log_meal('2025-03-02', '09:00')
+
+        self.client.post(reverse('activities:activity_update', args=[second.pk]), {
+            'name': 'Meal', 'consumed_at_date': '2025-03-03', 'consumed_at_time': '09:00',
+        })
+        self.client.post(reverse('activities:delete', args=[first.pk]))
+
+        incremental = self.rollups()
+        self.assertEqual(incremental, [
+            (date(2025, 3, 1), 'consume', 1),
+            (date(2025, 3, 3), 'consume', 1),
+        ])
+        rebuild_rollups()
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_timezone_change_rebuilds_rollups(self):
+        meal = self.log_meal('2025-03-01', '22:30')
+        self.user.timezone = 'Asia/Tokyo'
+        self.user.save()
+
+        # 22:30 in Toronto is the afternoon of the next day in Tokyo
+        self.assertEqual(self.rollups(), [(date(2025, 3, 2), 'consume', 1)])
+
+        # Later writes subtract from the same local day they were added to
+        self.client.post(reverse('activities:delete', args=[meal.pk]))
+        self.assertEqual(list(DailyRollup.objects.exclude(count=0).values_list('count', flat=True)), [])
+
+    def test_deleting_an_uncounted_activity_never_goes_negative(self):
+        # Created directly, so no rollup was ever counted for it
+        meal = Activity.objects.create(user=self.user, name='Meal', category=self.consume)
+        self.client.post(reverse('activities:delete', args=[meal.pk]))
+        self.assertFalse(DailyRollup.objects.exists())
+
+        kept = self.log_meal('2025-03-01', '08:00')
+        Activity.objects.create(user=self.user, name='Meal', category=self.consume, occurred_at=kept.occurred_at)
+        for activity in Activity.objects.all():
+            self.client.post(reverse('activities:delete', args=[activity.pk]))
+        self.assertEqual(list(DailyRollup.objects.values_list('count', flat=True)), [0])
+
+    def test_dashboard_reads_rollups(self):
+        self.log_meal(timezone.localdate(timezone.now(), self.user.get_timezone()).isoformat(), '00:00')
+        self.log_meal('2025-03-01', '08:00')
+        response = self.client.get(reverse('dashboard'))
 
-# Create your tests here.
+        this_week, streak, categories = response.context['cards']
+        self.assertEqual(this_week['value'], 1)
+        self.assertEqual(streak['value'], '1 day')
+        self.assertEqual(categories['value'], 1)
+        self.assertEqual(
+            [(row['category__name'], row['total']) for row in response.context['category_totals']],
+            [('Consume', 2)],
+        )
@@ -1,36 +1,41 @@
 from django.shortcuts import render
 
+from .rollups import dashboard_stats
+
 
 def dashboard_view(request):
     """View for the dashboard page."""
     if request.user.is_authenticated:
-        # Authenticated user sees the dashboard
+        # Authenticated user sees the dashboard, built from pre-aggregated daily rollups
+        stats = dashboard_stats(request.user)
+        streak = stats['streak']
         context = {
             'cards': [
                 {
-                    'title': 'Total Progress',
-                    'value': '75%',
-                    'description': 'Your overall progress in tracking your life goals.',
+                    'title': 'This Week',
+                    'value': stats['this_week'],
+                    'description': 'Activities you have logged since Monday.',
                     'icon': 'fas fa-chart-line',
                     'color': 'blue'
                 },
                 {
-                    'title': 'Tasks Completed',
-                    'value': '24',
-                    'description': 'Number of tasks you have completed this month.',
-                    'icon': 'fas fa-tasks',
+                    'title': 'Consumption Streak',
+                    'value': f"{streak} day{'' if streak == 1 else 's'}",
+                    'description': 'Consecutive days with at least one consumption logged.',
+                    'icon': 'fas fa-fire',
                     'color': 'green'
                 },
                 {
-                    'title': 'Upcoming Events',
-                    'value': '5',
-                    'description': 'Events coming up in the next 7 days.',
-                    'icon': 'fas fa-calendar',
+                    'title': 'Categories',
+                    'value': len(stats['categories']),
+                    'description': 'Activity categories you have logged so far.',
+                    'icon': 'fas fa-tags',
                     'color': 'purple'
                 }
-            ]
+            ],
+            'category_totals': stats['categories'],
         }
         return render(request, 'dashboard/dashboard.html', context)
     else:
         # Non-authenticated user sees the landing page
-        return render(request, 'dashboard/landing.html')
+        return render(request, 'dashboard/landing.html')
\ No newline at end of file
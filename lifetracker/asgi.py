@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lifetracker.settings')
+# Serve the activities JSON endpoints with their native async views
+os.environ.setdefault('LIFETRACKER_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    # Compile every template now rather than on the first request for each page
+    from core.templates import warm_up
+    warm_up()
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,13 +42,17 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     
     # Custom apps
+    'core',
     'users',
     'dashboard',
     'activities',
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.TraceMiddleware',  # Sampled request tracing, off unless TRACE_SAMPLE_RATE > 0
+    'core.profiling.ProfilingMiddleware',  # Query/latency profiling and Server-Timing, off unless PROFILING_ENABLED
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware',  # HTML minification and gzip/brotli encoding
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,23 +75,148 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.navbar',  # Navbar links and the current item, computed once
             ],
         },
     },
 ]
 
+# Template profile
+# LIFETRACKER_TEMPLATE_PROFILE selects how templates are loaded:
+#   'development' (default): Django's defaults; templates are cached and runserver's autoreloader
+#       clears them on edits, with template debug info following DEBUG
+#   'production': an explicit cached loader without template debug info, and every template under
+#       templates/ compiled when the WSGI/ASGI application starts (core.templates.warm_up)
+#   'uncached': templates are read and compiled on every render (for comparisons only)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_PROFILES = {
+    'development': {},
+    'production': {
+        'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
+        'debug': False,
+    },
+    'uncached': {
+        'loaders': TEMPLATE_LOADERS,
+    },
+}
+TEMPLATE_PROFILE = os.environ.get('LIFETRACKER_TEMPLATE_PROFILE', 'development')
+if TEMPLATE_PROFILE not in TEMPLATE_PROFILES:
+    raise ImproperlyConfigured(f"Unsupported LIFETRACKER_TEMPLATE_PROFILE: {TEMPLATE_PROFILE}")
+
+TEMPLATES[0]['OPTIONS'].update(TEMPLATE_PROFILES[TEMPLATE_PROFILE])
+# Django refuses APP_DIRS together with explicit loaders; app_directories.Loader covers it
+TEMPLATES[0]['APP_DIRS'] = 'loaders' not in TEMPLATES[0]['OPTIONS']
+TEMPLATE_WARMUP = TEMPLATE_PROFILE == 'production'
+
 WSGI_APPLICATION = 'lifetracker.wsgi.application'
+ASGI_APPLICATION = 'lifetracker.asgi.application'
+
+# Route the activities JSON endpoints to their native async views (see activities.async_views).
+# lifetracker.asgi turns this on by default; WSGI deployments keep the sync views.
+ASYNC_VIEWS = os.environ.get('LIFETRACKER_ASYNC_VIEWS') == '1'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# LIFETRACKER_DB_ENGINE selects 'sqlite' (default) or 'postgres'. Connections are kept
+# open for LIFETRACKER_DB_CONN_MAX_AGE seconds and health-checked before reuse.
+DB_ENGINE = os.environ.get('LIFETRACKER_DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('LIFETRACKER_DB_CONN_MAX_AGE', '60'))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('LIFETRACKER_DB_NAME', 'lifetracker'),
+            'USER': os.environ.get('LIFETRACKER_DB_USER', 'lifetracker'),
+            'PASSWORD': os.environ.get('LIFETRACKER_DB_PASSWORD', ''),
+            'HOST': os.environ.get('LIFETRACKER_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('LIFETRACKER_DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('LIFETRACKER_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported LIFETRACKER_DB_ENGINE: {DB_ENGINE}")
+
+# Pragmas applied to each new SQLite connection (see core.signals). WAL lets readers
+# run alongside a writer, and busy_timeout waits for the write lock instead of failing
+# with "database is locked". Set LIFETRACKER_SQLITE_TUNING=0 for SQLite's defaults.
+SQLITE_TUNING = os.environ.get('LIFETRACKER_SQLITE_TUNING', '1') == '1'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+} if SQLITE_TUNING else {}
+
+if DB_ENGINE == 'sqlite' and SQLITE_TUNING:
+    # Take the write lock when a transaction starts, so concurrent writers queue on
+    # busy_timeout rather than failing when a read lock can't be upgraded
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+
+# Cache
+# LIFETRACKER_CACHE_BACKEND selects 'locmem' (default, per process), 'file' or 'redis'
+# (any Redis-compatible server; requires redis from requirements-optional.txt). LIFETRACKER_CACHE_LOCATION
+# overrides the directory or server URL. Rendered activity cards are kept in the separate
+# 'template_fragments' cache, which Django's {% cache %} tag uses when it is defined.
+CACHE_BACKEND = os.environ.get('LIFETRACKER_CACHE_BACKEND', 'locmem')
+CACHE_LOCATION = os.environ.get('LIFETRACKER_CACHE_LOCATION')
+
+if CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lifetracker',
+        },
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lifetracker-fragments',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+elif CACHE_BACKEND == 'file':
+    CACHE_DIR = Path(CACHE_LOCATION or BASE_DIR / '.cache')
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR / 'default',
+        },
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR / 'fragments',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+elif CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_LOCATION or 'redis://127.0.0.1:6379/0',
+            'KEY_PREFIX': 'lifetracker',
+        },
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_LOCATION or 'redis://127.0.0.1:6379/0',
+            'KEY_PREFIX': 'lifetracker-fragments',
+        },
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported LIFETRACKER_CACHE_BACKEND: {CACHE_BACKEND}")
 
 
 # Password validation
@@ -127,6 +259,29 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed names plus .gz (and, with brotli installed, .br) siblings
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve Flowbite and Font Awesome from static/vendor/ (see the vendor_assets command) instead of cdnjs
+VENDORED_ASSETS = os.environ.get('LIFETRACKER_VENDORED_ASSETS') == '1'
+
+# Response compression (core.compression): minify HTML, then gzip or (with brotli installed)
+# brotli-encode text responses of at least COMPRESSION_MIN_SIZE bytes. The levels favour
+# speed, since dynamic pages are compressed on every request
+COMPRESSION_ENABLED = os.environ.get('LIFETRACKER_COMPRESSION', '1') == '1'
+HTML_MINIFY = COMPRESSION_ENABLED
+COMPRESSION_MIN_SIZE = 860
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+# Gzipped HTML gets up to this many random header bytes against BREACH (see CompressionMiddleware)
+COMPRESSION_RANDOM_BYTES = 100
+
+# Serve STATIC_ROOT from the app with precompressed siblings and immutable cache headers
+SERVE_STATIC = os.environ.get('LIFETRACKER_SERVE_STATIC') == '1'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -138,5 +293,80 @@ LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 LOGIN_URL = 'login'
 
-# Messages settings
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
+# Session profile
+# LIFETRACKER_SESSION_PROFILE selects where sessions, flash messages and request.user come from:
+#   'db' (default): database sessions, messages stored in the session, user loaded from the users table
+#   'cached_db': sessions read through the cache, cookie messages and a cached user snapshot (users.snapshot)
+#   'signed_cookies': sessions in a signed cookie, cookie messages and the cached user snapshot
+# The snapshot is invalidated through the cache, so use a shared cache backend with several workers.
+# Each profile lists both authentication backends, its own first: new logins use that one, and
+# sessions stored with the other stay logged in after a switch (database sessions keep loading
+# the user from the users table until they log in again).
+SESSION_PROFILES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.session.SessionStorage',
+        'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend', 'users.snapshot.SnapshotBackend'],
+    },
+    'cached_db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+        'AUTHENTICATION_BACKENDS': ['users.snapshot.SnapshotBackend', 'django.contrib.auth.backends.ModelBackend'],
+    },
+    'signed_cookies': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+        'AUTHENTICATION_BACKENDS': ['users.snapshot.SnapshotBackend', 'django.contrib.auth.backends.ModelBackend'],
+    },
+}
+SESSION_PROFILE = os.environ.get('LIFETRACKER_SESSION_PROFILE', 'db')
+if SESSION_PROFILE not in SESSION_PROFILES:
+    raise ImproperlyConfigured(f"Unsupported LIFETRACKER_SESSION_PROFILE: {SESSION_PROFILE}")
+
+SESSION_ENGINE = SESSION_PROFILES[SESSION_PROFILE]['SESSION_ENGINE']
+MESSAGE_STORAGE = SESSION_PROFILES[SESSION_PROFILE]['MESSAGE_STORAGE']
+AUTHENTICATION_BACKENDS = SESSION_PROFILES[SESSION_PROFILE]['AUTHENTICATION_BACKENDS']
+
+# Request tracing
+# Fraction of requests (0-1) whose timings and diagnostics are logged by core.instrumentation
+TRACE_SAMPLE_RATE = float(os.environ.get('LIFETRACKER_TRACE_SAMPLE_RATE', '0'))
+
+# Query and latency profiling
+# Adds Server-Timing headers and appends per-request stats to PROFILING_LOG (see manage.py profile_report)
+PROFILING_ENABLED = os.environ.get('LIFETRACKER_PROFILING') == '1'
+PROFILING_LOG = BASE_DIR / 'profiling.jsonl'
+
+# Maximum queries per view (by URL name), including the session and user lookups that
+# the 'db' session profile makes; requests over budget are logged as warnings
+SESSION_QUERIES = 2 if SESSION_PROFILE == 'db' else 0
+QUERY_BUDGETS = {
+    'activities:list': 4 + SESSION_QUERIES,
+    'activities:get_favorites': 1 + SESSION_QUERIES,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'lifetracker.trace': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'lifetracker.profiling': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'lifetracker.templates': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -15,10 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from django.views.generic import RedirectView
 from activities.views import activities_view
-from core.views import privacy_policy, terms_conditions
+from core.views import privacy_policy, serve_static, terms_conditions
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -30,3 +31,6 @@ urlpatterns = [
     path('terms-conditions/', terms_conditions, name='terms_conditions'),
     path('', RedirectView.as_view(url='/dashboard/', permanent=True)),
 ]
+
+if settings.SERVE_STATIC:
+    urlpatterns.insert(0, re_path(rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.*)$', serve_static, name='static'))
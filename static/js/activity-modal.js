@@ -345,6 +345,48 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Infinite scroll for activity lists rendered with a keyset cursor
+    const activitiesList = document.getElementById('activities-list');
+    if (activitiesList && activitiesList.dataset.nextCursor && 'IntersectionObserver' in window) {
+        const sentinel = document.createElement('div');
+        activitiesList.after(sentinel);
+        let loadingMore = false;
+
+        const scrollObserver = new IntersectionObserver(function(entries) {
+            if (!entries[0].isIntersecting || loadingMore || !activitiesList.dataset.nextCursor) return;
+            loadingMore = true;
+
+            // Keep the current filters and ask for the page after the cursor
+            const urlParams = new URLSearchParams(window.location.search);
+            urlParams.delete('page');
+            urlParams.set('cursor', activitiesList.dataset.nextCursor);
+
+            fetch(`/activities/?${urlParams.toString()}`, {
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest'
+                }
+            })
+            .then(response => response.text().then(html => ({ html, nextCursor: response.headers.get('X-Next-Cursor') })))
+            .then(({ html, nextCursor }) => {
+                const container = document.createElement('div');
+                container.innerHTML = html;
+                container.querySelectorAll('.activity-card').forEach(card => activitiesList.appendChild(card));
+
+                if (nextCursor) {
+                    activitiesList.dataset.nextCursor = nextCursor;
+                } else {
+                    delete activitiesList.dataset.nextCursor;
+                    scrollObserver.disconnect();
+                }
+            })
+            .finally(() => {
+                loadingMore = false;
+            });
+        });
+
+        scrollObserver.observe(sentinel);
+    }
+
     // Helper function to get CSRF token from cookies
     function getCookie(name) {
         let cookieValue = null;
@@ -1,5 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.urls import reverse_lazy
+
+from core.timezones import is_timezone
 from .models import CustomUser
 
 
@@ -59,13 +62,24 @@ class ProfileUpdateForm(forms.ModelForm):
             'placeholder': 'John Doe'
         })
     )
-    timezone = forms.ChoiceField(
-        choices=CustomUser._meta.get_field('timezone').choices,
-        widget=forms.Select(attrs={
-            'class': 'bg-gray-50 border border-gray-300 text-gray-900 text-sm rounded-lg focus:ring-blue-500 focus:border-blue-500 block w-full p-2.5 dark:bg-gray-700 dark:border-gray-600 dark:placeholder-gray-400 dark:text-white dark:focus:ring-blue-500 dark:focus:border-blue-500'
+    # A text input backed by the timezone search endpoint, instead of a <select> with ~600 options
+    timezone = forms.CharField(
+        max_length=50,
+        widget=forms.TextInput(attrs={
+            'class': 'bg-gray-50 border border-gray-300 text-gray-900 text-sm rounded-lg focus:ring-blue-500 focus:border-blue-500 block w-full p-2.5 dark:bg-gray-700 dark:border-gray-600 dark:placeholder-gray-400 dark:text-white dark:focus:ring-blue-500 dark:focus:border-blue-500',
+            'placeholder': 'Start typing a city or region',
+            'list': 'timezone-options',
+            'autocomplete': 'off',
+            'data-search-url': reverse_lazy('timezone_search'),
         })
     )
     
     class Meta:
         model = CustomUser
-        fields = ('name', 'timezone') 
\ No newline at end of file
+        fields = ('name', 'timezone')
+    
+    def clean_timezone(self):
+        timezone = self.cleaned_data['timezone'].strip()
+        if not is_timezone(timezone):
+            raise forms.ValidationError('Select a valid timezone.', code='invalid_choice')
+        return timezone 
\ No newline at end of file
@@ -1,29 +1,49 @@
 import zoneinfo
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.utils import timezone
 
+from core.timezones import UTC, get_zone
+
 
 class TimezoneMiddleware:
     """Middleware to set the active timezone based on user preferences."""
     
+    sync_capable = True
+    async_capable = True
+    
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
         
     def __call__(self, request):
-        if request.user.is_authenticated:
+        if self.async_mode:
+            return self.__acall__(request)
+        
+        self.activate(request.user)
+        
+        # Get the response
+        response = self.get_response(request)
+        
+        # Return the response
+        return response
+    
+    async def __acall__(self, request):
+        # Load the user without blocking the event loop
+        self.activate(await request.auser())
+        return await self.get_response(request)
+    
+    def activate(self, user):
+        if user.is_authenticated:
             try:
                 # Get the user's preferred timezone from their profile
-                tz = request.user.timezone
+                tz = user.timezone
                 # Set the current timezone using zoneinfo
-                timezone.activate(zoneinfo.ZoneInfo(tz))
+                timezone.activate(get_zone(tz))
             except (AttributeError, zoneinfo.ZoneInfoNotFoundError):
                 # If there's any issue, fall back to UTC
-                timezone.activate(zoneinfo.ZoneInfo('UTC'))
+                timezone.activate(UTC)
         else:
             # For unauthenticated users, use UTC
-            timezone.activate(zoneinfo.ZoneInfo('UTC'))
-            
-        # Get the response
-        response = self.get_response(request)
-        
-        # Return the response
-        return response 
\ No newline at end of file
+            timezone.activate(UTC)
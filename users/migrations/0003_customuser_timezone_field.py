@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:24
+
+import core.timezones
+import users.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_timezone'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='timezone',
+            field=users.models.TimezoneField(choices=core.timezones.timezone_choices, default='UTC', max_length=50, verbose_name='timezone'),
+        ),
+    ]
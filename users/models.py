@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone as django_timezone
-from zoneinfo import ZoneInfo, available_timezones
+
+from core.timezones import get_zone, is_timezone, timezone_choices
 
 
 class CustomUserManager(BaseUserManager):
@@ -37,15 +39,32 @@ class CustomUserManager(BaseUserManager):
         return self._create_user(email, name, password, **extra_fields)
 
 
-# Get common timezones for choices
-TIMEZONE_CHOICES = [(tz, tz) for tz in sorted(available_timezones())]
+class TimezoneField(models.CharField):
+    """CharField for IANA timezone names, with lazily loaded choices validated by a set lookup"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', 50)
+        kwargs.setdefault('choices', timezone_choices)
+        super().__init__(*args, **kwargs)
+
+    def validate(self, value, model_instance):
+        # Field.validate() scans all ~600 choices; this checks membership in the cached set
+        # and otherwise applies the same rules
+        if not self.editable:
+            return
+        if value not in self.empty_values and not is_timezone(value):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        if value is None and not self.null:
+            raise ValidationError(self.error_messages['null'], code='null')
+        if not self.blank and value in self.empty_values:
+            raise ValidationError(self.error_messages['blank'], code='blank')
 
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
     """Custom user model that uses email instead of username"""
     email = models.EmailField('email address', unique=True)
     name = models.CharField('name', max_length=150)
-    timezone = models.CharField('timezone', max_length=50, choices=TIMEZONE_CHOICES, default='UTC')
+    timezone = TimezoneField('timezone', default='UTC')
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(default=django_timezone.now)
@@ -58,6 +77,12 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
         
+    def get_session_auth_hash(self):
+        """Return the session auth hash, taken from the cached snapshot when the password isn't loaded"""
+        if 'password' in self.get_deferred_fields() and hasattr(self, 'snapshot_session_auth_hash'):
+            return self.snapshot_session_auth_hash
+        return super().get_session_auth_hash()
+    
     def get_timezone(self):
         """Return the user's timezone as a ZoneInfo object"""
-        return ZoneInfo(self.timezone)
+        return get_zone(self.timezone)
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CustomUser
+from .snapshot import invalidate_snapshot
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    # Drop the snapshot right away for this process, and again once other workers can see the change
+    user_id = instance.pk
+    invalidate_snapshot(user_id)
+    transaction.on_commit(lambda: invalidate_snapshot(user_id))
@@ -0,0 +1,59 @@
+"""
+Cached snapshots of the logged-in user.
+
+AuthenticationMiddleware loads request.user from the users table on every
+request. SnapshotBackend serves it from a small cache entry instead: the
+fields the navbar, middleware and views read, plus the session auth hash so
+Django can still verify the session without loading the password. Every
+other field is deferred and loads on first access. Saving or deleting a user
+drops their snapshot (see signals).
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .models import CustomUser
+
+SNAPSHOT_FIELDS = ('email', 'name', 'timezone', 'date_joined', 'is_active', 'is_staff', 'is_superuser')
+
+# Snapshots are dropped on write, so this only bounds how long an orphaned entry lives
+SNAPSHOT_TIMEOUT = 60 * 60
+
+
+def snapshot_cache_key(user_id):
+    return f'users:snapshot:{user_id}'
+
+
+def make_snapshot(user):
+    """Return the cached representation of a user"""
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    snapshot['session_auth_hash'] = user.get_session_auth_hash()
+    return snapshot
+
+
+def restore_snapshot(user_id, snapshot):
+    """Build a user instance from a snapshot, with the remaining fields deferred"""
+    values = {'id': user_id, **snapshot}
+    # from_db expects the loaded values in model field order
+    field_names = [field.attname for field in CustomUser._meta.concrete_fields if field.attname in values]
+    user = CustomUser.from_db(CustomUser.objects.db, field_names, [values[name] for name in field_names])
+    user.snapshot_session_auth_hash = snapshot['session_auth_hash']
+    return user
+
+
+def invalidate_snapshot(user_id):
+    cache.delete(snapshot_cache_key(user_id))
+
+
+class SnapshotBackend(ModelBackend):
+    """ModelBackend that loads request.user from a cached snapshot"""
+
+    def get_user(self, user_id):
+        snapshot = cache.get(snapshot_cache_key(user_id))
+        if snapshot is not None:
+            user = restore_snapshot(user_id, snapshot)
+            return user if self.user_can_authenticate(user) else None
+
+        user = super().get_user(user_id)
+        if user is not None:
+            cache.set(snapshot_cache_key(user_id), make_snapshot(user), SNAPSHOT_TIMEOUT)
+        return user
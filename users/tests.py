@@ -1,3 +1,109 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from .models import CustomUser
+
+
+@override_settings(**settings.SESSION_PROFILES['cached_db'])
+class SessionProfileTestCase(TestCase):
+    """Tests for the cached session profiles and the user snapshot."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', name='User', password='password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_repeat_requests_do_not_read_sessions_or_users(self):
+        self.client.get(reverse('profile'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'user@example.com')
+
+    def test_profile_update_refreshes_snapshot_and_flashes_a_cookie_message(self):
+        self.client.get(reverse('profile'))
+        response = self.client.post(reverse('profile'), {'name': 'Renamed', 'timezone': 'Asia/Tokyo'}, follow=True)
+
+        self.assertContains(response, 'Your profile has been updated successfully!')
+        self.assertIn('messages', response.cookies)
+        self.assertEqual(response.wsgi_request.user.name, 'Renamed')
+        self.assertEqual(self.client.get(reverse('profile')).wsgi_request.user.timezone, 'Asia/Tokyo')
+
+    def test_password_change_ends_the_session(self):
+        self.client.get(reverse('profile'))
+        self.user.set_password('changed')
+        self.user.save()
+
+        response = self.client.get(reverse('profile'))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('profile')}")
+
+    def test_inactive_snapshot_is_rejected(self):
+        self.client.get(reverse('profile'))
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+        # Saving through the model drops the snapshot
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 302)
+
+    @override_settings(**settings.SESSION_PROFILES['signed_cookies'])
+    def test_signed_cookie_sessions(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('profile'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+
+    def test_signup_logs_in_with_the_snapshot_backend(self):
+        self.client.logout()
+        response = self.client.post(reverse('signup'), {
+            'email': 'new@example.com', 'name': 'New', 'password1': 'a-Long-passw0rd', 'password2': 'a-Long-passw0rd',
+        })
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session['_auth_user_backend'], 'users.snapshot.SnapshotBackend')
+
+    def test_sessions_survive_a_profile_switch(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+        with override_settings(**settings.SESSION_PROFILES['db']):
+            self.client.force_login(self.user, backend='users.snapshot.SnapshotBackend')
+            self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+
+class TimezoneTestCase(TestCase):
+    """Tests for the timezone field, form validation and picker endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='user@example.com', name='User', password='password')
+
+    def test_search_matches_any_part_of_the_name(self):
+        response = self.client.get(reverse('timezone_search'), {'q': 'new york'})
+        self.assertEqual(response.json()['results'], ['America/New_York'])
+        self.assertIn('public', response['Cache-Control'])
+
+        response = self.client.get(reverse('timezone_search'), {'q': 'america/', 'limit': 5})
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertEqual(self.client.get(reverse('timezone_search'), {'limit': 'x'}).status_code, 400)
+
+    def test_unknown_timezones_are_rejected(self):
+        self.user.timezone = 'Mars/Olympus_Mons'
+        with self.assertRaises(ValidationError):
+            self.user.full_clean()
+
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('profile'), {'name': 'User', 'timezone': 'Mars/Olympus_Mons'})
+        self.assertContains(response, 'Select a valid timezone.')
+
+    def test_profile_page_does_not_list_every_timezone(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'value="UTC"')
+        self.assertNotContains(response, 'Pacific/Wallis')
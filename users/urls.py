@@ -7,4 +7,5 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', LogoutView.as_view(next_page='dashboard'), name='logout'),
     path('profile/', views.profile_view, name='profile'),
+    path('timezones/', views.timezone_search, name='timezone_search'),
 ] 
\ No newline at end of file
@@ -1,19 +1,30 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.contrib import messages
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
+
+from core.timezones import search_timezones
 from .forms import CustomUserCreationForm, CustomAuthenticationForm, ProfileUpdateForm
 
 
+# Most names the timezone picker asks for at once
+MAX_TIMEZONE_RESULTS = 50
+
+
 def signup_view(request):
     """View for user registration."""
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
             user = form.save()
-            login(request, user)
+            # Several backends are configured (see SESSION_PROFILES), so name the profile's own
+            login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
             return redirect('dashboard')
     else:
         form = CustomUserCreationForm()
@@ -52,3 +63,16 @@ def profile_view(request):
         'form': form,
     }
     return render(request, 'users/profile.html', context)
+
+
+@require_GET
+@cache_control(public=True, max_age=60 * 60 * 24)
+def timezone_search(request):
+    """Return the timezone names with a part starting with ?q=, for the timezone picker."""
+    query = request.GET.get('q', '')
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), MAX_TIMEZONE_RESULTS))
+    except ValueError:
+        return JsonResponse({'message': 'Invalid limit'}, status=400)
+    
+    return JsonResponse({'query': query, 'results': search_timezones(query, limit)})